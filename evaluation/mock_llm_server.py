@@ -0,0 +1,185 @@
+"""
+Local stand-in for an LLM server, to run the LLM evaluation without a model. It serves the Ollama chat API
+(/api/chat) and the OpenAI compatible chat completions API (/v1/chat/completions) of llama.cpp.
+
+The response is a fixed triple built from the last message and is sent after a configurable delay, such that
+the throughput of the analyzer can be measured independently of the model. Without a JSON schema in the request,
+a configurable fraction of the responses misses the triples, as unconstrained models sometimes do.
+
+The chat completions API simulates the prompt cache of llama.cpp (cache_prompt, id_slot): prompt tokens that
+match the previous prompt of the slot are not processed again, the other prompt tokens add a processing delay.
+
+    python mock_llm_server.py --port 11434 --delay 0.5 --invalid-rate 0.2 --token-delay 0.001
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def mock_triples(messages):
+    text = messages[-1]['content'] if messages else ''
+    words = text.strip(' .?!').split()
+    triple = {"subject": words[0] if words else "",
+              "predicate": words[1] if len(words) > 1 else "",
+              "object": "-".join(words[2:]),
+              "sentiment": 0, "polarity": 1, "certainty": 1}
+
+    return json.dumps({"triples": [triple]})
+
+
+def has_schema(request):
+    response_format = request.get('response_format') or {}
+
+    return isinstance(request.get('format'), dict) or response_format.get('type') == 'json_schema'
+
+
+def split_tokens(content):
+    tokens = content.split(' ')
+
+    return [token + ' ' for token in tokens[:-1]] + tokens[-1:]
+
+
+def prompt_tokens(messages):
+    return [token for message in messages
+            for token in [message.get('role', '') + ':'] + str(message.get('content', '')).split()]
+
+
+def count_tokens(messages):
+    return len(prompt_tokens(messages))
+
+
+def common_prefix(first, second):
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+
+    return length
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        self.server.requests += 1
+
+        content = mock_triples(request.get('messages', []))
+        if not has_schema(request) and self.server.random.random() < self.server.invalid_rate:
+            content = json.dumps({"answer": json.loads(content)["triples"]})
+        if self.path.startswith('/api/chat'):
+            self._ollama_chat(request, content)
+        elif self.path.startswith('/v1/chat/completions'):
+            self._openai_chat(request, content)
+        else:
+            self.send_error(404)
+
+    def _ollama_chat(self, request, content):
+        time.sleep(self.server.delay)
+        response = {"model": request.get('model', 'mock'),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "message": {"role": "assistant", "content": content},
+                    "done": True, "done_reason": "stop",
+                    "total_duration": int(self.server.delay * 1e9),
+                    "prompt_eval_count": count_tokens(request.get('messages', [])),
+                    "eval_count": len(content.split())}
+
+        if request.get('stream', True):
+            pieces = split_tokens(content)
+            chunks = [dict(response, message={"role": "assistant", "content": piece}, done=False)
+                      for piece in pieces[:-1]]
+            chunks.append(dict(response, message={"role": "assistant", "content": pieces[-1]}))
+            self._send('application/x-ndjson', ''.join(json.dumps(chunk) + '\n' for chunk in chunks))
+        else:
+            self._send('application/json', json.dumps(response))
+
+    def _openai_chat(self, request, content):
+        tokens = prompt_tokens(request.get('messages', []))
+        cached = self.server.process_prompt(request.get('id_slot', 0), tokens, request.get('cache_prompt', False))
+        time.sleep(self.server.delay + self.server.token_delay * (len(tokens) - cached))
+
+        usage = {"prompt_tokens": len(tokens), "completion_tokens": len(content.split()),
+                 "total_tokens": len(tokens) + len(content.split()),
+                 "prompt_tokens_details": {"cached_tokens": cached}}
+        response = {"id": "mock-%s" % self.server.requests, "object": "chat.completion", "created": int(time.time()),
+                    "model": request.get('model', 'mock'), "usage": usage,
+                    "timings": {"cache_n": cached, "prompt_n": len(tokens) - cached}}
+
+        if request.get('stream', False):
+            pieces = split_tokens(content)
+            chunks = [dict(response, object="chat.completion.chunk",
+                           choices=[{"index": 0, "delta": {"content": piece},
+                                     "finish_reason": "stop" if idx == len(pieces) - 1 else None}])
+                      for idx, piece in enumerate(pieces)]
+            self._send('text/event-stream', ''.join('data: %s\n\n' % json.dumps(chunk) for chunk in chunks)
+                       + 'data: [DONE]\n\n')
+        else:
+            response["choices"] = [{"index": 0, "message": {"role": "assistant", "content": content},
+                                    "finish_reason": "stop"}]
+            self._send('application/json', json.dumps(response))
+
+    def _send(self, content_type, body):
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, delay=0.5, invalid_rate=0.0, token_delay=0.0, handler=MockLLMHandler):
+        super().__init__(('localhost', port), handler)
+        self.delay = delay
+        self.invalid_rate = invalid_rate
+        self.token_delay = token_delay
+        self.random = random.Random(0)
+        self.requests = 0
+        self._slots = dict()
+        self._slots_lock = threading.Lock()
+
+    def process_prompt(self, slot, tokens, cache_prompt):
+        """Number of prompt tokens answered from the cache of the slot"""
+        with self._slots_lock:
+            cached = common_prefix(self._slots.get(slot, []), tokens) if cache_prompt else 0
+            self._slots[slot] = tokens
+
+        # llama.cpp always evaluates the last prompt token
+        return min(cached, len(tokens) - 1)
+
+    @property
+    def url(self):
+        return "http://localhost:%s" % self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock LLM server for the Ollama and OpenAI chat APIs")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds per response")
+    parser.add_argument("--invalid-rate", type=float, default=0.0,
+                        help="Fraction of responses without triples if no JSON schema is requested")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds per processed prompt token")
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.port, args.delay, args.invalid_rate, args.token_delay)
+    print("Mock LLM server on", server.url)
+    server.serve_forever()
@@ -12,6 +12,7 @@ from datetime import datetime
 from cltl.triple_extraction import logger
 from cltl.triple_extraction.api import Chat
 from cltl.triple_extraction.cfg_analyzer import CFGAnalyzer
+from cltl.triple_extraction.utils.helper_functions import triple_to_json
 from test_utils import log_report
 
 logger.setLevel(logging.ERROR)
@@ -60,7 +61,7 @@ def test_scenario(statements, questions, gold, resultfile):
         analyzer.analyze(chat.last_utterance)
 
         log_report(f"Utterance: {chat.last_utterance}", to_file=resultfile)
-        log_report(f"Triple:      \t{json.dumps(chat.last_utterance.triples)}", to_file=resultfile)
+        log_report(f"Triple:      \t{json.dumps([triple_to_json(triple) for triple in chat.last_utterance.triples])}", to_file=resultfile)
 
     # brain is queried and a reply is generated and compared with golden standard
     log_report(f'\nQUESTIONS\n', to_file=resultfile)
@@ -69,7 +70,7 @@ def test_scenario(statements, questions, gold, resultfile):
         analyzer.analyze(chat.last_utterance)
 
         log_report(f"Question:   \t{chat.last_utterance}", to_file=resultfile)
-        log_report(f"Triple:            \t{json.dumps(chat.last_utterance.triples)}", to_file=resultfile)
+        log_report(f"Triple:            \t{json.dumps([triple_to_json(triple) for triple in chat.last_utterance.triples])}", to_file=resultfile)
         log_report(f"Expected response: \t{gold.lower().strip()}\n", to_file=resultfile)
 
 
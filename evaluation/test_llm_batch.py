@@ -0,0 +1,141 @@
+"""
+THIS SCRIPT RUNS THE LLM EVALUATION SUITES (SEE test_llm.py AND test_llm_conversational_turns.py) WITH MULTIPLE
+CONCURRENT REQUESTS. ALL UTTERANCES OF A FILE ARE ANALYZED CONCURRENTLY WITH THE AsyncLLMAnalyzer AND SCORED
+AFTERWARDS WITH THE SAME STATISTICS AS THE SEQUENTIAL EVALUATION.
+
+    python test_llm_batch.py --concurrency 8 ./data/perspective.txt
+    python test_llm_batch.py --mock --conversation ./data/conversation_test_examples/test_explicit_yes_answers.txt
+
+RETRY RATE AND AVERAGE LATENCY ARE REPORTED PER FILE, E.G. TO COMPARE UNCONSTRAINED JSON OUTPUT WITH --structured.
+PROMPT TOKENS AND THE FRACTION ANSWERED FROM THE PROMPT CACHE ARE REPORTED AS WELL, E.G. TO COMPARE --prefix-cache:
+
+    python test_llm_batch.py --mock --backend llama.cpp --prefix-cache --slots 2 ./data/perspective.txt
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from cltl.triple_extraction import logger
+from cltl.triple_extraction.conversational_llm_analyzer import AsyncLLMAnalyzer, OLLAMA, LLAMA_CPP
+from mock_llm_server import MockLLMServer
+from test_llm_conversational_turns import load_golden_conversation_triples
+from test_utils import load_golden_triples, log_report, report, create_chat, score_triples
+
+logger.setLevel(logging.ERROR)
+
+
+def new_results():
+    return {'not_parsed': 0, 'correct': 0, 'incorrect': 0,
+            'correct_subjects': 0, 'incorrect_subjects': 0,
+            'correct_predicates': 0, 'incorrect_predicates': 0,
+            'correct_objects': 0, 'incorrect_objects': 0,
+            'correct_perspective': 0, 'incorrect_perspective': 0,
+            'correct_certainty': 0, 'incorrect_certainty': 0,
+            'correct_polarity': 0, 'incorrect_polarity': 0,
+            'correct_sentiment': 0, 'incorrect_sentiment': 0
+            }
+
+
+async def analyze_chats(analyzer, chats, is_conversation):
+    if is_conversation:
+        await asyncio.gather(*[analyzer.aanalyze_in_context(chat) for chat in chats])
+    else:
+        await asyncio.gather(*[analyzer.aanalyze_last_utterance(chat) for chat in chats])
+
+
+def test_triples_in_file_batch(analyzer_name, path, analyzer, resultfile, speakers, is_question=False,
+                               is_conversation=False, verbose=False):
+    results = new_results()
+    issues = defaultdict(dict)
+    if is_conversation:
+        test_suite = load_golden_conversation_triples(path)
+    else:
+        test_suite = load_golden_triples(path)
+
+    log_report(f'\nRUNNING {len(test_suite)} UTTERANCES FROM FILE {path}\n', to_file=resultfile)
+    chats = [create_chat(item, resultfile, speakers=speakers, is_question=is_question) for item in test_suite]
+
+    analyzer.stats.reset()
+    start = time.time()
+    analyzer.submit(analyze_chats(analyzer, chats, is_conversation)).result()
+    elapsed = time.time() - start
+    log_report(f'\nANALYZED {len(chats)} UTTERANCES IN {elapsed:.2f}s\n', to_file=resultfile)
+    log_report(f'\nRETRY RATE: {analyzer.stats.retry_rate:.2f}\t\t\tFAILURES: {analyzer.stats.failures}'
+               f'\t\t\tAVERAGE LATENCY: {analyzer.stats.average_latency:.2f}s\n', to_file=resultfile)
+    log_report(f'\nPROMPT TOKENS: {analyzer.stats.prompt_tokens}\t\t\tCACHED TOKENS: {analyzer.stats.cached_tokens}'
+               f'\t\t\tPREFIX HIT RATE: {analyzer.stats.prefix_hit_rate:.2f}\n', to_file=resultfile)
+
+    for item, chat in zip(test_suite, chats):
+        results, issues = score_triples(item, chat, results, issues, resultfile, verbose=verbose)
+
+    result_dict = report(analyzer_name, test_suite, path, results, issues, resultfile, verbose=verbose)
+    result_dict['elapsed'] = elapsed
+    result_dict['llm_stats'] = analyzer.stats.to_dict()
+
+    return result_dict
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the LLM evaluation with concurrent requests")
+    parser.add_argument("files", nargs="+", help="Test files")
+    parser.add_argument("--model", default="qwen2.5")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of concurrent requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout per utterance in seconds")
+    parser.add_argument("--conversation", action="store_true", help="Test files contain conversations")
+    parser.add_argument("--structured", action="store_true", help="Constrain the output to the triples JSON schema")
+    parser.add_argument("--backend", choices=[OLLAMA, LLAMA_CPP], default=OLLAMA)
+    parser.add_argument("--server", default="http://localhost", help="Host of the llama.cpp server")
+    parser.add_argument("--port", default="9001", help="Port of the llama.cpp server")
+    parser.add_argument("--prefix-cache", action="store_true", help="Reuse the instruction prompt prefix on the server")
+    parser.add_argument("--slots", type=int, default=1, help="Number of parallel slots of the llama.cpp server")
+    parser.add_argument("--mock", action="store_true", help="Run against a local mock LLM server")
+    parser.add_argument("--mock-delay", type=float, default=0.5, help="Response time of the mock server")
+    parser.add_argument("--mock-invalid-rate", type=float, default=0.2,
+                        help="Fraction of unconstrained mock responses without triples")
+    parser.add_argument("--mock-token-delay", type=float, default=0.0005,
+                        help="Processing time of the mock server per uncached prompt token")
+    args = parser.parse_args()
+
+    server = MockLLMServer(delay=args.mock_delay, invalid_rate=args.mock_invalid_rate,
+                           token_delay=args.mock_token_delay).start() if args.mock else None
+    llama_server, port = ("http://localhost", str(server.server_address[1])) if server else (args.server, args.port)
+    analyzer = AsyncLLMAnalyzer(model_name=args.model, temperature=0.1, keep_alive=20,
+                                max_concurrency=args.concurrency, timeout=args.timeout,
+                                base_url=server.url if server else None, structured_output=args.structured,
+                                backend=args.backend, llama_server=llama_server, port=port,
+                                prefix_cache=args.prefix_cache, slots=args.slots)
+    speakers = {'agent': 'speaker2', 'speaker': 'speaker1'} if args.conversation \
+        else {'agent': 'leolani', 'speaker': 'lenka'}
+
+    current_date = str(datetime.today().date())
+    analyzer_name = f"llm_batch_{args.model}" + ("_structured" if args.structured else "") \
+                    + ("_llamacpp" if args.backend == LLAMA_CPP else "") \
+                    + ("_prefix" if args.prefix_cache else "") + ("_mock" if args.mock else "")
+    report_folder = os.path.join("evaluation_reports", current_date)
+    if not os.path.exists(report_folder):
+        os.makedirs(report_folder)
+
+    resultfilename = f"{report_folder}/evaluation_{analyzer_name}_{current_date}.txt"
+    resultjson = f"{report_folder}/evaluation_{analyzer_name}_{current_date}.json"
+
+    jsonresults = []
+    with open(resultfilename, "w") as resultfile:
+        log_report(f'\nRUNNING {len(args.files)} FILES WITH {args.concurrency} CONCURRENT REQUESTS\n\n',
+                   to_file=resultfile)
+        for test_file in args.files:
+            result_dict = test_triples_in_file_batch(analyzer_name, test_file, analyzer, resultfile, speakers,
+                                                     is_question="question" in test_file,
+                                                     is_conversation=args.conversation)
+            jsonresults.append(result_dict)
+
+    with open(resultjson, 'w') as outfile:
+        json.dump(jsonresults, outfile)
+
+    analyzer.close()
+    if server:
+        server.stop()
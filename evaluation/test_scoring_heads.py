@@ -0,0 +1,75 @@
+"""
+THIS SCRIPT COMPARES THE CANDIDATE SCORING HEADS OF THE CONVERSATIONAL ANALYZER ON THE CONVERSATION TEST EXAMPLES.
+THE 'cross' HEAD RUNS THE DIALOGUE TOGETHER WITH EVERY CANDIDATE TRIPLE THROUGH THE TRANSFORMER, THE 'late' HEAD
+ENCODES THE DIALOGUE ONCE PER UTTERANCE AND SCORES ALL CANDIDATES AGAINST IT.
+FOR EACH HEAD AND TEST FILE THE TRIPLE PRECISION AND THE AVERAGE LATENCY PER UTTERANCE ARE REPORTED.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from cltl.triple_extraction import logger
+from cltl.triple_extraction.conversational_analyzer import ConversationalAnalyzer
+from test_conversational_turns import test_triples_in_file, load_golden_conversation_triples
+from test_utils import log_report
+
+logger.setLevel(logging.ERROR)
+
+
+if __name__ == "__main__":
+    # Usage: python test_scoring_heads.py [<model path> [<base model>]]
+    path = sys.argv[1] if len(sys.argv) > 1 else '/Users/piek/Desktop/d-Leolani/leolani-models/conversational_triples/2024-03-11'
+    base_model = sys.argv[2] if len(sys.argv) > 2 else 'google-bert/bert-base-multilingual-cased'
+    lang = 'en'
+
+    current_date = str(datetime.today().date())
+    report_folder = os.path.join("evaluation_reports", current_date)
+    if not os.path.exists(report_folder):
+        os.mkdir(report_folder)
+
+    resultfilename = f"{report_folder}/evaluation_SCORING_{base_model.replace('/', '_')}_{current_date}.txt"
+    resultfile = open(resultfilename, "w")
+    resultjson = f"{report_folder}/evaluation_SCORING_{base_model.replace('/', '_')}_{current_date}.json"
+
+    all_test_files = [
+        "./data/conversation_test_examples/test_answer_ellipsis.txt",
+        "./data/conversation_test_examples/test_coordination.txt",
+        "./data/conversation_test_examples/test_coreference.txt",
+        "./data/conversation_test_examples/test_declarative_statements.txt",
+        "./data/conversation_test_examples/test_declarative_statements_negated.txt",
+        "./data/conversation_test_examples/test_explicit_no_answers.txt",
+        "./data/conversation_test_examples/test_explicit_yes_answers.txt",
+    ]
+    speakers = {'agent': "speaker2", 'speaker': "speaker1"}
+
+    jsonresults = []
+    for head in ['cross', 'late']:
+        try:
+            analyzer = ConversationalAnalyzer(model_path=path, base_model=base_model, lang=lang, threshold=0.6,
+                                              max_triples=5, scoring_head=head)
+        except FileNotFoundError as e:
+            log_report(f'\nSKIPPED {head} SCORING HEAD: {e}\n', to_file=resultfile)
+            continue
+        analyzer_name = f"CONVST-{head}"
+        log_report(f'\nRUNNING {len(all_test_files)} FILES WITH {head} SCORING HEAD\n\n', to_file=resultfile)
+
+        for test_file in all_test_files:
+            nr_utterances = len(load_golden_conversation_triples(test_file))
+            start = time.perf_counter()
+            result_dict = test_triples_in_file(analyzer_name, test_file, analyzer, resultfile,
+                                               speakers=speakers, verbose=False)
+            elapsed = time.perf_counter() - start
+
+            result_dict.update({"scoring_head": head})
+            result_dict.update({"seconds_per_utterance": elapsed / max(1, nr_utterances)})
+            log_report(f"{head:>6} {test_file}: precision {result_dict['triple_precision']}, "
+                       f"{result_dict['seconds_per_utterance']:.3f} s/utterance", to_file=resultfile)
+            jsonresults.append(result_dict)
+
+    resultfile.close()
+    with open(resultjson, 'w') as outfile:
+        json.dump(jsonresults, outfile)
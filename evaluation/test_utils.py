@@ -4,6 +4,7 @@ import os
 from collections import defaultdict
 from datetime import datetime
 from cltl.triple_extraction.api import Chat, DialogueAct
+from cltl.triple_extraction.triple import TripleElement, Perspective
 
 
 def log_report(text, to_print=True, to_file=None):
@@ -144,7 +145,7 @@ def compare_elementwise(triple, gold, resultfile, verbose=True):
             print('Key not in gold.keys in compare_elementwise', key, gold.keys())
             continue
 
-        if type(triple[key]) == dict:
+        if isinstance(triple[key], (dict, TripleElement, Perspective)):
             # This is a triple
             if 'label' in triple[key]:
                 match_result = triple[key]['label'].lower() == gold[key]
@@ -226,33 +227,48 @@ def test_triples(item, results, issues, resultfile, analyzer,
 
     log_report(f'\n---------------------------------------------------------------\n', to_file=resultfile)
 
+    chat = create_chat(item, resultfile, speakers=speakers, is_question=is_question)
+    analyze_chat(chat, analyzer, is_conversation=is_conversation)
+
+    return score_triples(item, chat, results, issues, resultfile, verbose=verbose)
+
+
+def create_chat(item, resultfile, speakers={'agent': 'leolani', 'speaker': 'lenka'}, is_question=False):
+    """
+    Create a chat with the given speakers and add the utterances in 'item'
+    """
     # create chat and add utterance
     chat = Chat(agent=speakers['agent'], speaker=speakers['speaker'])
 
     # Check if item contains several utterances and add them
-    if '<eos>' in item['utterance']:
-        previous_utterances = item['utterance'].split('<eos>')
-        item['utterance'] = previous_utterances[-1]
+    utterance = item['utterance']
+    if '<eos>' in utterance:
+        previous_utterances = utterance.split('<eos>')
+        utterance = previous_utterances[-1]
         previous_utterances = previous_utterances[:-1]
 
         # Determine speaker based on how long the dialogue history is (we must always end with agent, as the utterance to be analyzed is from the speaker)
         for i, p_utt in enumerate(previous_utterances):
             sp = speakers['speaker'] if (len(previous_utterances) % 2) == (i % 2) else speakers['agent']
             chat.add_utterance(p_utt, sp)
-        log_report(f'\n{item["utterance"]}\n', to_file=resultfile)
+        log_report(f'\n{utterance}\n', to_file=resultfile)
 
     # Add last utterance, checking if it is a question
     if is_question:
-        chat.add_utterance(item['utterance'], speakers['speaker'], [DialogueAct.QUESTION])
+        chat.add_utterance(utterance, speakers['speaker'], [DialogueAct.QUESTION])
     else:
-        chat.add_utterance(item['utterance'], speakers['speaker'], [DialogueAct.STATEMENT])
+        chat.add_utterance(utterance, speakers['speaker'], [DialogueAct.STATEMENT])
 
+    return chat
+
+
+def analyze_chat(chat, analyzer, is_conversation=False):
     # analyze utterance
     if type(analyzer).__name__ in ['CFGAnalyzer', 'spacyAnalyzer', 'OIEAnalyzer']:
         analyzer.analyze(chat)
     elif type(analyzer).__name__ in ['StanzaQuestionAnalyzer', 'ConversationalAnalyzer']:
        analyzer.analyze_in_context(chat)
-    elif type(analyzer).__name__ in ['LLMAnalyzer']:
+    elif type(analyzer).__name__ in ['LLMAnalyzer', 'AsyncLLMAnalyzer']:
         if is_conversation:
             analyzer.analyze_in_context(chat)
         else:
@@ -260,6 +276,11 @@ def test_triples(item, results, issues, resultfile, analyzer,
     elif type(analyzer).__name__ in ['ConversationalQuestionAnalyzer']:
         analyzer.analyze_question_in_context(chat)
 
+
+def score_triples(item, chat, results, issues, resultfile, verbose=True):
+    """
+    Collect statistics on the triples extracted for the last utterance of the chat
+    """
     # No triple was extracted, so we missed three items (s, p, o)
     if not chat.last_utterance.triples:
         # Log issues
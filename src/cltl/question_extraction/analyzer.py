@@ -3,6 +3,8 @@ import logging
 import threading
 
 from cltl.triple_extraction.api import Chat
+from cltl.triple_extraction.utils.helper_functions import element_to_json
+from cltl.triple_extraction.utils.trace import trace
 
 
 logger = logging.getLogger(__name__)
@@ -42,13 +44,17 @@ class Analyzer:
             if not triple_is_new:
                 return
 
+            trace("triple", analyzer=self.__class__.__name__, turn=self.utterance.turn, triple=triple)
+            if not logger.isEnabledFor(logging.INFO):
+                return
+
             if utterance_type:
                 self._log_info("Utterance type: {}".format(json.dumps(utterance_type.name,
                                                                       sort_keys=True, separators=(', ', ': '))))
 
             if triple:
                 for el in ["subject", "predicate", "object"]:
-                    self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(triple[el],
+                    self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(element_to_json(triple[el]),
                                                                                   sort_keys=True, separators=(', ', ': '))))
 
     @property
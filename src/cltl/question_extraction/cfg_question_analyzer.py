@@ -20,8 +20,7 @@ class CFGQuestionAnalyzer(Analyzer):
         # Load Grammar Json
         self._cfgAnalyzer.LEXICON = lexicon
 
-        # Load ntlk Tree generated by the CFG parser
-        # TODO: Optimize: takes 2.6 seconds now! Should be < 1 second!?
+        # Own parser state, the taggers are shared and started on first use
         self._cfgAnalyzer.PARSER = Parser()
 
     @property
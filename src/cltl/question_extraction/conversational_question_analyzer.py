@@ -1,4 +1,3 @@
-import itertools
 import logging
 from typing import List
 
@@ -192,9 +191,7 @@ class ConversationalQuestionAnalyzer(Analyzer):
         return self._triple_normalizer.normalize(self.utterance, self.get_simple_triple(triple))
 
     def _chat_to_conversation(self, chat):
-        utterances_by_speaker = [(speaker, " ".join(utt.transcript for utt in utterances)) for speaker, utterances
-                                 in itertools.groupby(chat.utterances, lambda utt: utt.utterance_speaker)]
-        utterances_by_speaker = utterances_by_speaker[-3:]
+        utterances_by_speaker = chat.speaker_turns[-3:]
 
         speakers = list(zip(*utterances_by_speaker))[0]
         turns = list(zip(*utterances_by_speaker))[1]
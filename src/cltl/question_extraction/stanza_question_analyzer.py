@@ -30,6 +30,7 @@ class StanzaQuestionAnalyzer(Analyzer):
         self._parser = stanza.Pipeline(lang='en', processors='tokenize,mwt,pos,lemma,constituency')
         self._utterance = None
         self._triples = []
+        self._triple_extractor = CFGAnalyzer()
 
     @property
     def utterance(self):
@@ -42,15 +43,19 @@ class StanzaQuestionAnalyzer(Analyzer):
     def analyze_in_context(self, chat: Chat):
         self.analyze(chat.last_utterance)
 
-    def analyze(self, utterance: Utterance, triple_extractor = CFGAnalyzer() ):
+    def analyze(self, utterance: Utterance, triple_extractor=None):
         """
 
         Parameters
         ----------
         utterance: Utterance
             utterance to be analyzed
+        triple_extractor: Analyzer
+            Analyzer to extract triples from the statement, defaults to a CFGAnalyzer
 
         """
+        if triple_extractor is None:
+            triple_extractor = self._triple_extractor
         try:
             self._triples = []
             self._utterance = utterance
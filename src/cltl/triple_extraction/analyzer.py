@@ -6,6 +6,9 @@ from cltl.commons import discrete
 from cltl.commons.triple_helpers import continuous_to_enum
 
 from cltl.triple_extraction.api import Chat
+from cltl.triple_extraction.triple import Triple
+from cltl.triple_extraction.utils.helper_functions import element_to_json
+from cltl.triple_extraction.utils.trace import trace
 
 
 logger = logging.getLogger(__name__)
@@ -36,6 +39,7 @@ class Analyzer:
     def set_extracted_values(self, utterance_type=None, triple=None, perspective=None):
         with self._analyzer_lock:
             # Pack everything together
+            triple = Triple.from_dict(triple)
             if not "perspective" in triple:
                 triple["perspective"] = perspective if perspective else {}
             elif perspective:
@@ -48,13 +52,17 @@ class Analyzer:
             if not triple_is_new:
                 return
 
+            trace("triple", analyzer=self.__class__.__name__, turn=self.utterance.turn, triple=triple)
+            if not logger.isEnabledFor(logging.INFO):
+                return
+
             if utterance_type:
                 self._log_info("Utterance type: {}".format(json.dumps(utterance_type.name,
                                                                       sort_keys=True, separators=(', ', ': '))))
 
             if triple:
                 for el in ["subject", "predicate", "object"]:
-                    self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(triple[el],
+                    self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(element_to_json(triple[el]),
                                                                                   sort_keys=True, separators=(', ', ': '))))
             if triple["perspective"]:
                 for el in ['certainty', 'polarity', 'sentiment', 'emotion']:
@@ -65,6 +73,7 @@ class Analyzer:
     def set_extracted_values_given_perspective(self, utterance_type=None, triple=None):
         with self._analyzer_lock:
             # Pack everything together
+            triple = Triple.from_dict(triple)
             triple["utterance_type"] = utterance_type
             # Set type, and triple
             triple_is_new = self.utterance.add_json_triple(triple)
@@ -72,13 +81,17 @@ class Analyzer:
             if not triple_is_new:
                 return
 
+            trace("triple", analyzer=self.__class__.__name__, turn=self.utterance.turn, triple=triple)
+            if not logger.isEnabledFor(logging.INFO):
+                return
+
             if utterance_type:
                 self._log_info("Utterance type: {}".format(json.dumps(utterance_type.name,
                                                                       sort_keys=True, separators=(', ', ': '))))
 
             if triple:
                 for el in ["subject", "predicate", "object"]:
-                    self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(triple[el],
+                    self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(element_to_json(triple[el]),
                                                                                   sort_keys=True, separators=(', ', ': '))))
             if triple["perspective"]:
                 for el in ['certainty', 'polarity', 'sentiment', 'emotion']:
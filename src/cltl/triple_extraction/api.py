@@ -1,13 +1,25 @@
 import enum
+import functools
+import json
+from collections import deque
 from datetime import datetime
 from random import getrandbits
-from typing import List
+from typing import List, Tuple
 
 from cltl.commons.casefolding import casefold_text
 from nltk import pos_tag
 
 from cltl.triple_extraction import logger
-from cltl.triple_extraction.utils.helper_functions import add_deduplicated
+from cltl.triple_extraction.utils.helper_functions import add_deduplicated, triple_to_json
+
+_chat_logger = logger.getChild("Chat")
+
+
+# Characters removed from the transcript, apostrophes separate contractions
+_PUNCTUATION = str.maketrans({"!": None, "?": None, ",": None, ".": None, "'": " "})
+_CONTRACTIONS = {'m': 'am', 're': 'are', 'll': 'will'}
+_NEGATIONS = {'t': 'not', 'won': 'will', 'don': 'do', 'doesn': 'does', 'didn': 'did', 'haven': 'have',
+              'wouldn': 'would', 'aren': 'are'}
 
 
 class DialogueAct(enum.Enum):
@@ -16,7 +28,7 @@ class DialogueAct(enum.Enum):
 
 
 class Chat:
-    def __init__(self, agent, speaker):
+    def __init__(self, agent, speaker, turn_window: int = 3, max_utterances: int = None, spill_path: str = None):
         """
         Create Chat
 
@@ -26,15 +38,29 @@ class Chat:
             Name of the agent (a.k.a. Pepper)
         speaker: str
             Name of speaker (a.k.a. the person Pepper has a chat with)
+        turn_window: int
+            Number of most recent speaker turns kept in speaker_turns
+        max_utterances: int
+            Number of most recent utterances kept in memory, all utterances are kept if None
+        spill_path: str
+            Optional JSON lines file to which utterances are appended when they are removed from memory,
+            the file is kept open until the Chat is closed
         """
+        if max_utterances is not None and max_utterances < 1:
+            raise ValueError("max_utterances must be at least 1, was " + str(max_utterances))
 
         self._id = getrandbits(8)
         self._speaker = str(speaker)  # self._agent1
         self._agent = str(agent)  # self._agent2
         self._utterances = []
+        self._turns = 0
+        self._max_utterances = max_utterances
+        self._spill_path = spill_path
+        self._spill_file = None
+        # Most recent speaker turns as (speaker, transcripts), i.e. consecutive utterances of the same speaker
+        self._speaker_turns = deque(maxlen=turn_window)
 
-        self._log = self._update_logger()
-        self._log.info("<< Start of Chat with {} >>".format(speaker))
+        _chat_logger.info("<< Start of Chat with %s >>", speaker)
 
     @property
     def speaker(self):
@@ -88,10 +114,33 @@ class Chat:
         Returns
         -------
         utterances: list of Utterance
-            List of utterances that occurred in this chat
+            List of utterances that occurred in this chat, at most max_utterances most recent ones
         """
         return self._utterances
 
+    @property
+    def turns(self):
+        # type: () -> int
+        """
+        Returns
+        -------
+        turns: int
+            Number of utterances added to this chat, including utterances that were removed from memory
+        """
+        return self._turns
+
+    @property
+    def speaker_turns(self):
+        # type: () -> List[Tuple[str, str]]
+        """
+        Returns
+        -------
+        speaker_turns: list of (str, str)
+            The most recent speaker turns (at most turn_window) as pairs of speaker and the joined
+            transcripts of consecutive utterances of that speaker
+        """
+        return [(speaker, " ".join(transcripts)) for speaker, transcripts in self._speaker_turns]
+
     @property
     def last_utterance(self):
         # type: () -> Utterance
@@ -103,7 +152,8 @@ class Chat:
         """
         return self._utterances[-1]
 
-    def add_utterance(self, transcript: str, utterance_speaker: str = None, dialogue_acts: List[DialogueAct] = None):
+    def add_utterance(self, transcript: str, utterance_speaker: str = None, dialogue_acts: List[DialogueAct] = None,
+                      tokenize: bool = True):
         """
         Add Utterance to Conversation
 
@@ -112,25 +162,58 @@ class Chat:
         transcript: str
         utterance_speaker: str
         dialogue_acts: List[DialogueAct]
+        tokenize: bool
+            If False the utterance has no tokens, e.g. for utterances that are not analyzed
 
         Returns
         -------
         utterance: Utterance
         """
-        utterance = Utterance(self, transcript, len(self._utterances), utterance_speaker, dialogue_acts)
+        utterance = Utterance(self, transcript, self._turns, utterance_speaker, dialogue_acts, tokenize=tokenize)
+        self._turns += 1
 
         # @TODO we do not know who the speaker is
         # utterance._chat_speaker = self._speaker
         # utterance._chat_agent = self._agent
         self._utterances.append(utterance)
+        self._evict()
+        if self._speaker_turns and self._speaker_turns[-1][0] == utterance_speaker:
+            self._speaker_turns[-1][1].append(transcript)
+        else:
+            self._speaker_turns.append((utterance_speaker, [transcript]))
 
-        self._log = self._update_logger()
-        self._log.info(utterance)
+        _chat_logger.info("%s", utterance)
 
         return utterance
 
-    def _update_logger(self):
-        return logger.getChild("Chat".format(self.speaker, len(self._utterances)))
+    def _evict(self):
+        if self._max_utterances is None or len(self._utterances) <= self._max_utterances:
+            return
+
+        evicted = self._utterances[:-self._max_utterances]
+        del self._utterances[:-self._max_utterances]
+
+        if self._spill_path:
+            if self._spill_file is None:
+                self._spill_file = open(self._spill_path, 'a', encoding='utf-8')
+            self._spill_file.writelines(json.dumps(utterance.to_json(), ensure_ascii=False) + "\n"
+                                        for utterance in evicted)
+            # Keep the spill file complete if the chat is never closed
+            self._spill_file.flush()
+
+    def close(self):
+        """
+        Close the file to which removed utterances are appended, if any
+        """
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def __repr__(self):
         return "\n".join([str(utterance) for utterance in self._utterances])
@@ -138,7 +221,7 @@ class Chat:
 
 class Utterance:
     def __init__(self, chat: Chat, transcript: str, turn: int, utterance_speaker=None,
-                 dialogue_acts: List[DialogueAct] = None):
+                 dialogue_acts: List[DialogueAct] = None, tokenize: bool = True):
         """
         Construct Utterance Object
 
@@ -150,10 +233,10 @@ class Utterance:
             Text representing the transcript of what was said
         turn: int
             Utterance Turn
+        tokenize: bool
+            If False the utterance has no tokens, otherwise the transcript is tokenized on first access
         """
 
-        self._log = logger.getChild(self.__class__.__name__)
-
         self._chat = chat
         self._utterance_speaker = utterance_speaker
         # @WARNING This information duplicate the chat information and _chat_speaker is not necesarily the speaker of the utterance.
@@ -164,12 +247,12 @@ class Utterance:
         self._datetime = datetime.now()
 
         self._transcript = transcript
-        self._tokens = self._clean(self._tokenize(self._transcript))
+        self._tokens = None if tokenize else []
 
         self._dialogue_acts = dialogue_acts if dialogue_acts else []
 
         self._triples = []
-        self._triples_as_json = []  # Convenience for deduplication
+        self._triple_keys = set()  # Convenience for deduplication
 
     @property
     def chat(self) -> Chat:
@@ -262,12 +345,15 @@ class Utterance:
         tokens: list of str
             Tokenized transcript
         """
+        if self._tokens is None:
+            self._tokens = self._clean(self._tokenize(self._transcript))
+
         return self._tokens
 
     def add_triple(self, triple):
         # type: (dict) -> (bool)
 
-        self._triples_as_json, triple_is_new = add_deduplicated(triple, self._triples_as_json)
+        self._triple_keys, triple_is_new = add_deduplicated(triple, self._triple_keys)
 
         if triple_is_new:
             # Add triple
@@ -282,6 +368,24 @@ class Utterance:
 
         return True
 
+    def to_json(self):
+        # type: () -> dict
+        """
+        Returns
+        -------
+        utterance: dict
+            JSON serializable representation of the utterance and its triples
+        """
+        dialogue_acts = self._dialogue_acts if isinstance(self._dialogue_acts, list) else [self._dialogue_acts]
+
+        return {"chat": self._chat.id,
+                "turn": self._turn,
+                "speaker": self._utterance_speaker,
+                "transcript": self._transcript,
+                "dialogue_acts": [act.name for act in dialogue_acts if act],
+                "datetime": self._datetime.isoformat(),
+                "triples": [triple_to_json(triple) for triple in self._triples]}
+
     def casefold(self, format='triple'):
         # type (str) -> ()
         """
@@ -334,51 +438,47 @@ class Utterance:
                     transcript = transcript.replace(i.lower(), '')
 
         # separating typical contractions
-        transcript = transcript.replace("!", "")
-        transcript = transcript.replace("?", "")
-        transcript = transcript.replace(",", "")
-        transcript = transcript.replace(".", "")
-        tokens_raw = transcript.replace("'", " ").split()
-        dict = {'m': 'am', 're': 'are', 'll': 'will'}
-        dict_not = {'won': 'will', 'don': 'do', 'doesn': 'does', 'didn': 'did', 'haven': 'have', 'wouldn': 'would',
-                    'aren': 'are'}
-
-        for key in dict:
-            tokens_raw = self._replace_token(tokens_raw, key, dict[key])
-
-        if 't' in tokens_raw:
-            tokens_raw = self._replace_token(tokens_raw, 't', 'not')
-            for key in dict_not:
-                tokens_raw = self._replace_token(tokens_raw, key, dict_not[key])
+        tokens_raw = transcript.translate(_PUNCTUATION).split()
+
+        # replace the first occurrence of each contraction in a single pass, negations only if there is a 't'
+        has_not = 't' in tokens_raw
+        replaced = set()
+        tokens = []
+        genitive = None
+        for token in tokens_raw:
+            if token in replaced:
+                tokens.append(token)
+            elif token in _CONTRACTIONS:
+                replaced.add(token)
+                tokens.append(_CONTRACTIONS[token])
+            elif has_not and token in _NEGATIONS:
+                replaced.add(token)
+                tokens.append(_NEGATIONS[token])
+            elif token == 's':
+                replaced.add(token)
+                genitive = len(tokens)
+            else:
+                tokens.append(token)
 
         # in case of possessive genitive the 's' is just removed, while for the aux verb 'is' is inserted
-        if 's' in tokens_raw:
-            index = tokens_raw.index('s')
-            try:
-                tag = pos_tag([tokens_raw[index + 1]])
-                if tag[0][1] in ['DT', 'JJ', 'IN'] or tag[0][1].startswith('V'):  # determiner, adjective, verb
-                    tokens_raw.remove('s')
-                    tokens_raw.insert(index, 'is')
-                else:
-                    tokens_raw.remove('s')
-            except:
-                tokens_raw.remove('s')
-
-        return tokens_raw
+        if genitive is not None and genitive < len(tokens):
+            tag = self._pos_tag(tokens[genitive])
+            if tag in ['DT', 'JJ', 'IN'] or tag.startswith('V'):  # determiner, adjective, verb
+                tokens.insert(genitive, 'is')
+
+        return tokens
 
     @staticmethod
-    def _replace_token(tokens_raw, old, new):
-        """
-        :param tokens_raw: list of tokens
-        :param old: token to replace
-        :param new: new token
-        :return: new list with the replaced token
-        """
-        if old in tokens_raw:
-            index = tokens_raw.index(old)
-            tokens_raw.remove(old)
-            tokens_raw.insert(index, new)
-        return tokens_raw
+    @functools.lru_cache(maxsize=4096)
+    def _pos_tag(token):
+        """
+        :param token: single token
+        :return: POS tag of the token by NLTK, cached as mostly the same closed class words are tagged
+        """
+        try:
+            return pos_tag([token])[0][1]
+        except:
+            return ''
 
     @staticmethod
     def _clean(tokens):
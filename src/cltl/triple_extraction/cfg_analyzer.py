@@ -1,4 +1,5 @@
 import logging
+import threading
 
 from cltl.commons.discrete import UtteranceType
 from cltl.commons.language_helpers import lexicon_lookup, lexicon, lexicon_lookup_subword, lexicon_lookup_subword_class
@@ -7,6 +8,8 @@ from cltl.commons.triple_helpers import fix_nlp_types
 from cltl.triple_extraction.analyzer import Analyzer
 from cltl.triple_extraction.api import Chat, Utterance, DialogueAct
 from cltl.triple_extraction.nlp.parser import Parser
+from cltl.triple_extraction.nlp.shared import SharedInstance
+from cltl.triple_extraction.triple import Triple, TripleElement
 from cltl.triple_extraction.utils.helper_functions import get_triple_element_type, lemmatize, trim_dash, fix_pronouns, \
     get_pos_in_tree
 import cltl.triple_extraction.utils.standard_question_to_triple as standard_question
@@ -18,9 +21,12 @@ class CFGAnalyzer(Analyzer):
     # Load Grammar Json
     LEXICON = lexicon
 
-    # Load ntlk Tree generated by the CFG parser
-    # TODO: Optimize: takes 2.6 seconds now! Should be < 1 second!?
-    PARSER = Parser()
+    # Load ntlk Tree generated by the CFG parser, the parser is created on first use (see warm_up)
+    PARSER = SharedInstance(Parser)
+    # The PARSER holds the state of the current parse and is shared by all instances, which are therefore
+    # serialized by the lock, also when they run concurrently in a ChatAnalyzer. The parser is shared to
+    # avoid creating it and starting its taggers for every instance.
+    PARSER_LOCK = threading.RLock()
 
     def __init__(self, process_questions: bool = True):
         """
@@ -37,6 +43,13 @@ class CFGAnalyzer(Analyzer):
     def utterance(self):
         return self._utterance
 
+    @classmethod
+    def warm_up(cls):
+        """
+        Create the parser and start its taggers ahead of the first utterance.
+        """
+        cls.PARSER.warm_up()
+
     def analyze_in_context(self, chat: Chat):
         self.analyze(chat)
 
@@ -52,6 +65,10 @@ class CFGAnalyzer(Analyzer):
             utterance to be analyzed
 
         """
+        with CFGAnalyzer.PARSER_LOCK:
+            self._analyze(chat)
+
+    def _analyze(self, chat):
         self._utterance = chat.last_utterance
         # if not self._process_questions and DialogueAct.QUESTION in utterance.dialogue_acts:
         #     return
@@ -179,13 +196,13 @@ class CFGAnalyzer(Analyzer):
         """
         This function gets types for all the elements of the triple
         :param triple: S,P,C triple
-        :return: triple dictionary with types
+        :return: Triple with types
         """
         # Get type
         for el in triple:
             text = triple[el]
             final_type = []
-            triple[el] = {'label': text, 'type': []}
+            triple[el] = TripleElement(text, [])
 
             # If no text was extracted we cannot get a type
             if text == '':
@@ -245,7 +262,7 @@ class CFGAnalyzer(Analyzer):
                 elif 'proximity' in entry:
                     triple[el]['type'] = ['deictic']
 
-        return triple
+        return Triple.from_dict(triple)
 
     def get_kinship(self, triple, utterance_info):
         kinship_word = ""
@@ -599,7 +616,7 @@ class CFGAnalyzer(Analyzer):
         if lexicon_lookup(triple['subject'].lower()) and 'person' in lexicon_lookup(triple['subject'].lower()):
             if triple['predicate'] == 'be':
                 subject = fix_pronouns(triple['subject'], self.utterance.utterance_speaker, self.utterance._chat_speaker, self.utterance._chat_agent)
-                print('subject after pronoun fix', subject)
+                logger.debug('subject after pronoun fix %s', subject)
                 pred = ''
                 for el in triple['subject'].split('-')[1:]:
                     pred += el + '-'
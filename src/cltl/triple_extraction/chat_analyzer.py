@@ -1,18 +1,60 @@
+import copy
 import logging
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Union
 
 from cltl.question_extraction.analyzer import Analyzer
-from cltl.triple_extraction.api import Chat
+from cltl.triple_extraction.api import Chat, Utterance
 
 logger = logging.getLogger(__name__)
 
 
+def _fork_utterance(utterance: Utterance) -> Utterance:
+    """Copy of the utterance without triples, such that an analyzer can add triples without affecting the original."""
+    fork = copy.copy(utterance)
+    # Tokenize once for all forks
+    fork._tokens = list(utterance.tokens)
+    fork._triples = []
+    fork._triple_keys = set()
+
+    return fork
+
+
+class _ChatView:
+    """Read-only view on a Chat in which the last utterance is replaced by a fork."""
+    def __init__(self, chat: Chat, last_utterance: Utterance):
+        self._view_chat = chat
+        self._view_last_utterance = last_utterance
+
+    @property
+    def last_utterance(self):
+        return self._view_last_utterance
+
+    @property
+    def utterances(self):
+        return self._view_chat.utterances[:-1] + [self._view_last_utterance]
+
+    def __getattr__(self, name):
+        return getattr(self._view_chat, name)
+
+
 class _AnalyzerContextTask:
     def __init__(self, analyzer: Analyzer, chat):
         self._analyzer = analyzer
-        self._chat = chat
+        self._chat = _ChatView(chat, _fork_utterance(chat.last_utterance))
+
+    @property
+    def utterance(self):
+        return self._chat.last_utterance
+
+    def submit(self, executor):
+        if hasattr(self._analyzer, 'aanalyze_in_context'):
+            # Asynchronous analyzers run on their own event loop and can be cancelled when they exceed the timeout
+            return self._analyzer.submit(self._analyzer.aanalyze_in_context(self._chat))
+
+        return executor.submit(self)
 
     def __call__(self, *args, **kwargs):
         self._analyzer.analyze_in_context(self._chat)
@@ -21,35 +63,107 @@ class _AnalyzerContextTask:
 class _AnalyzerUtteranceTask:
     def __init__(self, analyzer: Analyzer, utterance):
         self._analyzer = analyzer
-        self._utterance = utterance
+        self._utterance = _fork_utterance(utterance)
+
+    @property
+    def utterance(self):
+        return self._utterance
+
+    def submit(self, executor):
+        return executor.submit(self)
 
     def __call__(self, *args, **kwargs):
         self._analyzer.analyze(self._utterance)
 
 
 class ChatAnalyzer(Analyzer):
-    def __init__(self, analyzers: List[Analyzer], timeout: float = 0.0):
+    def __init__(self, analyzers: List[Analyzer], timeout: Union[float, List[float]] = 0.0):
+        """
+        Runs multiple analyzers concurrently and merges their triples into the analyzed utterance, triples that
+        are extracted by more than one analyzer are added only once.
+
+        Analyzers that share state are not run in parallel: all CFGAnalyzers share the state of the current parse
+        and are serialized by CFGAnalyzer.PARSER_LOCK, combining multiple CFGAnalyzers therefore gives no speed up.
+
+        Parameters
+        ----------
+        analyzers: List[Analyzer]
+            Analyzers to run, each analyzer runs in its own worker thread or, if asynchronous, on its own event loop
+        timeout: float or List[float]
+            Deadline in seconds after which results of an analyzer are discarded, either for all analyzers or
+            for each analyzer individually. A timeout <= 0 waits until the analyzer is done.
+        """
         super().__init__()
         self._analyzers = analyzers
-        self._timeout = timeout
+        self._timeouts = list(timeout) if isinstance(timeout, (list, tuple)) else [timeout] * len(analyzers)
+        if len(self._timeouts) != len(analyzers):
+            raise ValueError(f"Expected {len(analyzers)} timeouts, got {len(self._timeouts)}")
         self._chat = None
 
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(analyzers)), thread_name_prefix="ChatAnalyzer")
+        self._running = [None] * len(analyzers)
+        self._lock = threading.Lock()
+
     def analyze_in_context(self, chat: Chat):
         self._chat = chat
-        self._parallel(_AnalyzerContextTask(analyzer, chat) for analyzer in self._analyzers)
+        self._parallel(chat.last_utterance, [_AnalyzerContextTask(analyzer, chat) for analyzer in self._analyzers])
 
     def analyze(self, utterance):
         """Deprecated, use `analyze_in_context` instead!"""
-        self._parallel(_AnalyzerUtteranceTask(analyzer, utterance) for analyzer in self._analyzers)
+        self._parallel(utterance, [_AnalyzerUtteranceTask(analyzer, utterance) for analyzer in self._analyzers])
+
+    def close(self):
+        """Stop the worker threads, analyzers that are still running are not interrupted."""
+        with self._lock:
+            for future in self._running:
+                if future:
+                    future.cancel()
+            self._executor.shutdown(wait=False)
+
+    def _parallel(self, utterance, tasks):
+        with self._lock:
+            start = time.time()
+            futures = [self._submit(idx, task) for idx, task in enumerate(tasks)]
+
+            for idx, (task, future) in enumerate(zip(tasks, futures)):
+                if not future:
+                    continue
+
+                timeout = self._timeouts[idx]
+                remaining = max(0.0, start + timeout - time.time()) if timeout > 0 else None
+                wait([future], timeout=remaining)
+                self._merge(utterance, task, future, time.time() - start)
+
+    def _submit(self, idx, task):
+        running = self._running[idx]
+        if running and not running.done():
+            logger.warning("Skipped %s, previous extraction is still running", task._analyzer.__class__.__name__)
+            return None
+
+        self._running[idx] = task.submit(self._executor)
+
+        return self._running[idx]
+
+    def _merge(self, utterance, task, future, elapsed):
+        name = task._analyzer.__class__.__name__
+
+        if not future.done():
+            future.cancel()
+            logger.warning("Discarded triples of %s, exceeded timeout after %s", name, elapsed)
+            return
+        if future.cancelled():
+            logger.warning("Extraction for %s was cancelled", name)
+            return
+
+        try:
+            future.result()
+        except:
+            logger.exception("Exception during triple extraction for %s", name)
+            return
 
-    def _parallel(self, tasks):
-        for task in tasks:
-            try:
-                start = time.time()
-                task()
-                logger.debug("Extracted triples for %s in %s", task._analyzer.__class__.__name__, time.time() - start)
-            except:
-                logger.exception("Exception during triple extraction for %s", task._analyzer.__class__.__name__)
+        for triple in task.utterance.triples:
+            utterance.add_triple(triple)
+        logger.debug("Extracted %s triples for %s in %s", len(task.utterance.triples), name, elapsed)
 
     @property
     def utterance(self):
@@ -68,4 +182,4 @@ class ChatAnalyzer(Analyzer):
         -------
         triple: dict or None
         """
-        return self.utterance.triple
\ No newline at end of file
+        return self.utterance.triple
@@ -1,4 +1,3 @@
-import itertools
 import logging
 from typing import List
 
@@ -7,6 +6,7 @@ from cltl.commons.discrete import UtteranceType, Polarity, Certainty
 from cltl.triple_extraction.analyzer import Analyzer
 from cltl.triple_extraction.api import Chat, DialogueAct, Utterance
 from cltl.triple_extraction.conversational_triples.conversational_triple_extraction import AlbertTripleExtractor
+from cltl.triple_extraction.triple import Triple, TripleElement, Perspective
 from cltl.triple_extraction.utils.triple_normalization import TripleNormalizer
 import cltl.triple_extraction.utils.standard_question_to_triple as standard_question
 logger = logging.getLogger(__name__)
@@ -22,7 +22,8 @@ qverbs_nl = ["kan", "kun", "wil", "ben", "is", "zijn", "waren", "moet", "ga", "z
 
 class ConversationalAnalyzer(Analyzer):
     def __init__(self, model_path: str, base_model: str, threshold: float = 0.8, max_triples: int = 0,
-                 batch_size: int = 8, dialogue_acts: List[DialogueAct] = None, lang="en"):
+                 batch_size: int = 8, dialogue_acts: List[DialogueAct] = None, lang="en",
+                 scoring_head: str = 'cross'):
         """
         Parameters
         ----------
@@ -30,11 +31,13 @@ class ConversationalAnalyzer(Analyzer):
             Path to the model
         dialogue_acts: List[DialogueAct]
             Dialogue acts for which triple extraction should be performed
+        scoring_head: str
+            Candidate scoring head, 'cross' (default) or 'late' to encode the dialogue only once per utterance
         """
         super().__init__()
 
         self._extractor = AlbertTripleExtractor(path=model_path, base_model=base_model, max_triples=max_triples,
-                                                lang=lang)
+                                                lang=lang, scoring_head=scoring_head)
         self._triple_normalizer = TripleNormalizer()
         self._threshold = threshold
         self._max_triples = max_triples
@@ -113,12 +116,11 @@ class ConversationalAnalyzer(Analyzer):
             self._utterance = chat.last_utterance
             speakers, conversation, speaker1, speaker2 = self._chat_to_conversation(chat)
 
+            # Thresholding happens in the extractor, before post-processing
             extracted_triples = self._extractor.extract_triples(speakers, conversation, chat.speaker, chat.agent,
-                                                                batch_size=self._batch_size)
-            triples = [self._convert_triple(triple_value)
-                       for score, triple_value
-                       in sorted(extracted_triples, key=lambda r: r[0], reverse=True)
-                       if score >= self._threshold]
+                                                                batch_size=self._batch_size,
+                                                                threshold=self._threshold)
+            triples = [self._convert_triple(triple_value) for score, triple_value in extracted_triples]
             triples = list(filter(None, triples))
         else:
             logger.debug('This is not from the human speaker', chat.speaker, ' but from:',
@@ -249,23 +251,20 @@ class ConversationalAnalyzer(Analyzer):
         if len(triple_value) < 3:
             return None
 
-        triple = {"subject": {"label": triple_value[0], "type": [], "uri": None},
-                  "predicate": {"label": triple_value[1], "type": [], "uri": None},
-                  "object": {"label": triple_value[2], "type": [], "uri": None}
-                  }
+        triple = Triple(subject=TripleElement(triple_value[0]),
+                        predicate=TripleElement(triple_value[1]),
+                        object=TripleElement(triple_value[2]))
 
         if len(triple_value) == 4:
-            triple["perspective"] = {"polarity": Polarity.from_str(triple_value[3]).value}
+            triple["perspective"] = Perspective(polarity=Polarity.from_str(triple_value[3]).value)
         elif len(triple_value) == 5:
-            triple["perspective"] = {"polarity": Polarity.from_str(triple_value[3]).value,
-                                     "certainty": Certainty.from_str(triple_value[4]).value}
+            triple["perspective"] = Perspective(polarity=Polarity.from_str(triple_value[3]).value,
+                                                certainty=Certainty.from_str(triple_value[4]).value)
 
         return self._triple_normalizer.normalize(self.utterance, get_simple_triple(triple))
 
     def _chat_to_conversation(self, chat):
-        utterances_by_speaker = [(speaker, " ".join(utt.transcript for utt in utterances)) for speaker, utterances
-                                 in itertools.groupby(chat.utterances, lambda utt: utt.utterance_speaker)]
-        utterances_by_speaker = utterances_by_speaker[-3:]
+        utterances_by_speaker = chat.speaker_turns[-3:]
         speakers = list(zip(*utterances_by_speaker))[0]
         turns = list(zip(*utterances_by_speaker))[1]
         conversation = ("<eos>" * min(2, (3 - len(utterances_by_speaker)))) + "<eos>".join(turns)
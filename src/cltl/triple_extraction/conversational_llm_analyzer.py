@@ -1,19 +1,30 @@
-import itertools
+import asyncio
+import concurrent.futures
 import logging
+import threading
+import time
+import weakref
 from typing import List
 import json
 from cltl.commons.discrete import UtteranceType, Polarity, Certainty
 from cltl.triple_extraction.conversational_triples.utils import pronoun_to_speaker_name
 from langchain_ollama import ChatOllama
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
-from cltl.triple_extraction.prompts.prompts import STATEMENT, QUESTION, CONVERSATION_SHORT, CONVERSATION_LONG, tools
+from cltl.triple_extraction.prompts.prompts import STATEMENT, QUESTION, CONVERSATION_SHORT, CONVERSATION_LONG, tools, \
+    TRIPLES_SCHEMA
 from cltl.triple_extraction.analyzer import Analyzer
 from cltl.triple_extraction.api import Chat, DialogueAct, Utterance
+from cltl.triple_extraction.llm.cache import ResponseCache
+from cltl.triple_extraction.llm.stats import LLMStats
+from cltl.triple_extraction.llm.streaming import TripleStreamParser, parse_triples
+from cltl.triple_extraction.triple import Triple, TripleElement, Perspective
 # to use ollama pull the model from the terminal in the venv: ollama pull <model-name>
 #LLAMA_MODEL = "llama3.2:1b"
 LLAMA_MODEL = "llama3.2"
 QWEN_MODEL = "qwen2.5"
+OLLAMA = "ollama"
+LLAMA_CPP = "llama.cpp"
 logger = logging.getLogger(__name__)
 #from ollama.keep_alive import KeepAlive
 
@@ -28,7 +39,9 @@ prepositions_nl = ["in", "op", "naar", "van", "bij", "onder", "voor", "naast", "
 class LLMAnalyzer(Analyzer):
     def __init__(self, model_name: str, temperature: float = 0.1,
                  s_instruct= STATEMENT.INSTRUCT, q_instruct = QUESTION.INSTRUCT, c_instruct = CONVERSATION_LONG.INSTRUCT,
-                 keep_alive=10, llama_server= "http://localhost", port= "9001"):
+                 keep_alive=10, llama_server= "http://localhost", port= "9001", cache: ResponseCache = None,
+                 base_url: str = None, stream: bool = False, structured_output: bool = False,
+                 backend: str = OLLAMA, prefix_cache: bool = False, num_ctx: int = None, slots: int = 1):
         """
         Parameters
         ----------
@@ -36,6 +49,25 @@ class LLMAnalyzer(Analyzer):
             Path to the model
         dialogue_acts: List[DialogueAct]
             Dialogue acts for which triple extraction should be performed
+        cache: ResponseCache
+            Optional cache for the LLM responses, keyed by model, temperature and prompt
+        base_url: str
+            URL of the Ollama server, defaults to the local Ollama server
+        stream: bool
+            Stream the response and add each triple to the utterance as soon as it is complete
+        structured_output: bool
+            Constrain the output of the model to the JSON schema of the triples instead of arbitrary JSON
+        backend: str
+            Either OLLAMA or LLAMA_CPP, for a llama.cpp server at llama_server:port
+        prefix_cache: bool
+            Let the server reuse the processed instruction prompt across requests. For Ollama the model is kept
+            loaded with a fixed context size, for llama.cpp the prompt cache is enabled and each instruction
+            is assigned to its own slot.
+        num_ctx: int
+            Context size of the Ollama model, changing it between requests reloads the model, defaults to 8192 with
+            prefix_cache
+        slots: int
+            Number of parallel slots of the llama.cpp server (--parallel) available for the instructions
         """
         super().__init__()
 
@@ -45,8 +77,17 @@ class LLMAnalyzer(Analyzer):
         self._model = model_name
         url = llama_server+ ":"+port+"/v1"
         self._llama_client = OpenAI(base_url=url, api_key="not-needed")
+        self._allama_client = AsyncOpenAI(base_url=url, api_key="not-needed")
+        self._backend = backend
+        # Server that answers the requests, part of the cache key
+        self._server_url = url if backend == LLAMA_CPP else base_url
+        self._prefix_cache = prefix_cache
+        self._slots = slots
         self._temperature = temperature
-        self._keep_alive = keep_alive
+        # Keep the model and its prompt cache loaded
+        self._keep_alive = -1 if prefix_cache else keep_alive
+        num_ctx = num_ctx if num_ctx or not prefix_cache else 8192
+        self._format = TRIPLES_SCHEMA if structured_output else 'json'
         self._llm = ChatOllama(
             model=self._model,
             temperature=self._temperature,
@@ -55,11 +96,16 @@ class LLMAnalyzer(Analyzer):
             # repeat_last_n = 0,
             # top_k = 5,
             # top_p = 0.5,
-            format = 'json',
-            tools = tools
+            format = self._format,
+            tools = tools,
+            base_url = base_url,
+            num_ctx = num_ctx
             # other params ...
         )
+        self._cache = cache
+        self._stream = stream
         self._chat = None
+        self.stats = LLMStats()
 
     # def call_llama_server (self, prompt):
     #     completion = self._llama_client.chat.completions.create(
@@ -106,29 +152,10 @@ class LLMAnalyzer(Analyzer):
 
         """
 
-        triples = []
-        input = {"role":"user", "content":chat.last_utterance.transcript}
-        instruct = self._s_instruct
-        if chat.last_utterance.dialogue_acts[0]==DialogueAct.QUESTION:
-            instruct = self._q_instruct
-        prompt = [instruct, input]
-        print('PROMPT', prompt)
-        attempt = 0
-        max=3
-        while not triples and attempt<max:
-            attempt += 1
-            response = self._llm.invoke(prompt)
-            try:
-                content = json.loads(response.content)
-                #print('content', content)
-                if "triples" in content:
-                    triples.extend(content["triples"])
-            except:
-                logger.debug("ERROR parsing JSON",response.content)
-        for triple_value in triples:
-            triple = self._convert_triple(triple_value, chat.last_utterance.utterance_speaker, chat.speaker, chat.agent)
-            if triple:
-                chat.last_utterance.triples.append(triple)
+        prompt = self._last_utterance_prompt(chat)
+        logger.debug('PROMPT %s', prompt)
+        utterance = chat.last_utterance
+        self._extract_triples(prompt, lambda triple: self._add_triples(chat, utterance, [triple]))
 
     def analyze_in_context(self, chat):
         """
@@ -143,7 +170,20 @@ class LLMAnalyzer(Analyzer):
 
         """
 
-        triples = []
+        prompt = self._context_prompt(chat)
+        logger.debug('INPUT %s', prompt)
+        utterance = chat.last_utterance
+        self._extract_triples(prompt, lambda triple: self._add_triples(chat, utterance, [triple]))
+
+    def _last_utterance_prompt(self, chat):
+        input = {"role":"user", "content":chat.last_utterance.transcript}
+        instruct = self._s_instruct
+        if chat.last_utterance.dialogue_acts[0]==DialogueAct.QUESTION:
+            instruct = self._q_instruct
+
+        return [instruct, input]
+
+    def _context_prompt(self, chat):
         instruct = self._c_instruct
         if chat.last_utterance.dialogue_acts[0]==DialogueAct.QUESTION:
             instruct = self._q_instruct
@@ -151,23 +191,166 @@ class LLMAnalyzer(Analyzer):
 
         conversation = self._chat_to_conversation(chat)
         prompt.extend(conversation)
-        print('INPUT', prompt)
+
+        return prompt
+
+    def _add_triples(self, chat, utterance, triples):
+        added = []
+        for triple_value in triples:
+            triple = self._convert_triple(triple_value, utterance.utterance_speaker, chat.speaker, chat.agent)
+            if triple:
+                utterance.triples.append(triple)
+                added.append(triple)
+
+        return added
+
+    def _extract_triples(self, prompt, on_triple):
+        """Retry until the response contains a triple that can be converted, on_triple returns the converted triples"""
+        start = time.time()
+        triples = []
         attempt = 0
         max=3
         while not triples and attempt<max:
             attempt += 1
-            response = self._llm.invoke(prompt)
-            try:
-                content = json.loads(response.content)
-                print('content', content)
-                if "triples" in content:
-                    triples.extend(content["triples"])
-            except:
-                logger.debug("ERROR parsing JSON",response.content)
-        for triple_value in triples:
-            triple = self._convert_triple(triple_value, chat.last_utterance.utterance_speaker, chat.speaker, chat.agent)
-            if triple:
-                chat.last_utterance.triples.append(triple)
+            if self._stream:
+                triples = self._stream_triples(prompt, on_triple)
+            else:
+                triples = [triple for triple_value in self._parse_triples(self._invoke(prompt))
+                           for triple in on_triple(triple_value)]
+        self.stats.record(attempt, bool(triples), time.time() - start)
+
+        return triples
+
+    def _stream_triples(self, prompt, on_triple):
+        parser = TripleStreamParser()
+        triples = []
+
+        def emit(completed):
+            for triple in completed:
+                triples.extend(on_triple(triple))
+
+        def generate():
+            for chunk in self._generate_stream(prompt):
+                emit(parser.feed(chunk))
+            emit(parser.close())
+
+            return parser.text
+
+        if not self._cache:
+            generate()
+        else:
+            content = self._cache.get_or_call(self._cache_key(prompt), generate, accept=lambda content: bool(triples))
+            if not parser.text:
+                # Answered from the cache or by a concurrent request
+                emit(self._parse_triples(content))
+
+        return triples
+
+    def _invoke(self, prompt):
+        if not self._cache:
+            return self._generate(prompt)
+
+        key = self._cache_key(prompt)
+
+        # Only store responses with complete triples, such that retries are not answered from the cache
+        return self._cache.get_or_call(key, lambda: self._generate(prompt), accept=self._has_complete_triples)
+
+    def _generate(self, prompt):
+        if self._backend == LLAMA_CPP:
+            completion = self._llama_client.chat.completions.create(**self._llama_request(prompt))
+            self._record_usage(completion)
+
+            return completion.choices[0].message.content
+
+        response = self._llm.invoke(prompt)
+        self._record_usage(response)
+
+        return response.content
+
+    def _generate_stream(self, prompt):
+        if self._backend == LLAMA_CPP:
+            completion = self._llama_client.chat.completions.create(**self._llama_request(prompt, stream=True))
+            for chunk in completion:
+                self._record_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        else:
+            for chunk in self._llm.stream(prompt):
+                self._record_usage(chunk)
+                yield chunk.content
+
+    def _llama_request(self, prompt, stream=False):
+        request = dict(model=self._model, messages=prompt, temperature=self._temperature, stream=stream)
+        if stream:
+            request["stream_options"] = {"include_usage": True}
+        if self._format != 'json':
+            request["response_format"] = {"type": "json_schema",
+                                          "json_schema": {"name": "triples", "schema": self._format}}
+        else:
+            request["response_format"] = {"type": "json_object"}
+        if self._prefix_cache:
+            request["extra_body"] = {"cache_prompt": True, "id_slot": self._slot(prompt)}
+
+        return request
+
+    def _slot(self, prompt):
+        """Assign each instruction to a fixed slot, such that its processed prompt stays cached in that slot"""
+        instructions = [self._c_instruct, self._q_instruct, self._s_instruct]
+        idx = instructions.index(prompt[0]) if prompt and prompt[0] in instructions else 0
+
+        return idx % max(1, self._slots)
+
+    def _record_usage(self, response):
+        """Record the prompt tokens and the tokens answered from the prompt cache, as far as reported by the server"""
+        if self._backend == LLAMA_CPP:
+            usage = getattr(response, "usage", None)
+            if not usage:
+                return
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) if details else None
+            if cached is None:
+                timings = (getattr(response, "model_extra", None) or {}).get("timings") or {}
+                cached = timings.get("cache_n", 0)
+            self.stats.record_tokens(usage.prompt_tokens, cached)
+        else:
+            metadata = getattr(response, "response_metadata", None) or {}
+            if "prompt_eval_count" in metadata:
+                # Ollama reports the number of prompt tokens that were evaluated, i.e. without cache hits
+                self.stats.record_tokens(metadata["prompt_eval_count"], None)
+
+    def _cache_key(self, prompt):
+        return ResponseCache.key(backend=self._backend, base_url=self._server_url, model=self._model,
+                                 temperature=self._temperature, format=self._format, messages=prompt)
+
+    def _parse_triples(self, content):
+        triples = parse_triples(content)
+        if not triples:
+            logger.debug("No triples in response %s", content)
+
+        return triples
+
+    def _has_complete_triples(self, content):
+        return any(self._is_complete(triple_value) for triple_value in self._parse_triples(content))
+
+    @staticmethod
+    def _is_complete(triple_value):
+        return all(triple_value.get(key) is not None for key in ('subject', 'predicate', 'object'))
+
+    @staticmethod
+    def _convert_perspective(triple_value):
+        """Perspective from the scores of the triple or its nested perspective, None if they are partial or invalid"""
+        scores = triple_value
+        if not all(key in triple_value for key in ('polarity', 'certainty', 'sentiment')):
+            scores = triple_value.get('perspective')
+        if scores is None:
+            return None
+
+        try:
+            return Perspective(polarity=float(scores['polarity']), certainty=float(scores['certainty']),
+                               sentiment=float(scores['sentiment']))
+        except (KeyError, TypeError, ValueError):
+            logger.debug("Ignored invalid perspective %s", scores)
+            return None
 
     #@TODO needs to be fixed as we are requesting different output format now
     def analyze_in_context_server(self, chat):
@@ -211,9 +394,8 @@ class LLMAnalyzer(Analyzer):
         if len(triple_value) < 3:
             return None
         triple = None
-        print('triple_value', triple_value)
-        if 'subject' in triple_value and 'predicate' in triple_value and 'object' in triple_value and\
-            not triple_value['subject']==None and not triple_value['predicate'] ==None and not triple_value['object']==None:
+        logger.debug('triple_value %s', triple_value)
+        if self._is_complete(triple_value):
            # not triple_value['subject']=='' and not triple_value['predicate'] =='' and not triple_value['object']=='' and\
             ### Fix pronouns to names
             triple_value['subject'] = pronoun_to_speaker_name(triple_value['subject'], speaker, human, agent)
@@ -239,15 +421,13 @@ class LLMAnalyzer(Analyzer):
 
             triple_value['predicate'] = triple_value['predicate'].replace("_", "-")
             triple_value['predicate'] = triple_value['predicate'].replace(" ", "-")
-            triple = {"subject": {"label": triple_value['subject'].lower(), "type": [], "uri": None},
-                          "predicate": {"label": triple_value['predicate'].lower(), "type": [], "uri": None},
-                          "object": {"label": triple_value['object'].lower(), "type": [], "uri": None}
-                          }
-            if 'polarity' in triple_value and 'certainty' in triple_value and 'sentiment' in triple_value:
-                triple["perspective"] = {"polarity": float(triple_value["polarity"]),"certainty": float(triple_value['certainty']), "sentiment": float(triple_value['sentiment'])}
-            elif 'perspective' in triple_value:
-                triple["perspective"] = {"polarity": float(triple_value["perspective"]["polarity"]),"certainty": float(triple_value["perspective"]['certainty']), "sentiment": float(triple_value["perspective"]['sentiment'])}
-        print('triple=', triple)
+            triple = Triple(subject=TripleElement(triple_value['subject'].lower()),
+                            predicate=TripleElement(triple_value['predicate'].lower()),
+                            object=TripleElement(triple_value['object'].lower()))
+            perspective = self._convert_perspective(triple_value)
+            if perspective is not None:
+                triple["perspective"] = perspective
+        logger.debug('triple= %s', triple)
         return triple
 
     def _fix_pp_objects(self, triple):
@@ -260,18 +440,16 @@ class LLMAnalyzer(Analyzer):
 
     def _chat_to_conversation(self, chat):
         conversation = []
-        utterances_by_speaker = [(speaker, " ".join(utt.transcript for utt in utterances)) for speaker, utterances
-                                 in itertools.groupby(chat.utterances, lambda utt: utt.utterance_speaker)]
-        utterances_by_speaker = utterances_by_speaker[-3:]
+        utterances_by_speaker = chat.speaker_turns[-3:]
         speakers = list(zip(*utterances_by_speaker))[0]
         turns = list(zip(*utterances_by_speaker))[1]
 
-        print(utterances_by_speaker)
+        logger.debug('%s', utterances_by_speaker)
         #print(speakers)
         #print(turns)
         for element in utterances_by_speaker:
             utterance = None
-            print('element[0]', element[0])
+            logger.debug('element[0] %s', element[0])
             if chat.agent == element[0]:
               #  utterance = {'role': 'assistant', 'content': f'''{element[0]} said {element[1]}'''}
                 utterance = {'role': 'user','content': element[1],  'speaker': element[0]}
@@ -280,9 +458,185 @@ class LLMAnalyzer(Analyzer):
                 utterance = {'role': 'user','content': element[1],  'speaker': element[0]}
             if utterance:
                 conversation.append(utterance)
-        print(conversation)
+        logger.debug('%s', conversation)
         return conversation
 
+class AsyncLLMAnalyzer(LLMAnalyzer):
+    def __init__(self, model_name: str, max_concurrency: int = 4, timeout: float = 60.0, **kwargs):
+        """
+        LLMAnalyzer that sends its requests asynchronously, such that multiple utterances can be analyzed concurrently.
+
+        Analysis of a chat is cancelled when a newer utterance of the same chat is analyzed.
+
+        Parameters
+        ----------
+        model_name: str
+            Name of the Ollama model
+        max_concurrency: int
+            Maximum number of requests to the LLM in flight
+        timeout: float
+            Timeout in seconds for the analysis of an utterance, a timeout <= 0 waits until the analysis is done
+        kwargs:
+            Further arguments of the LLMAnalyzer
+        """
+        super().__init__(model_name, **kwargs)
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._pending = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    async def aanalyze_in_context(self, chat):
+        await self._analyze(chat, self._context_prompt(chat))
+
+    async def aanalyze_last_utterance(self, chat):
+        await self._analyze(chat, self._last_utterance_prompt(chat))
+
+    def analyze_in_context(self, chat):
+        self._wait(self.submit(self.aanalyze_in_context(chat)))
+
+    def analyze_last_utterance(self, chat):
+        self._wait(self.submit(self.aanalyze_last_utterance(chat)))
+
+    def submit(self, coroutine):
+        """
+        Run a coroutine, e.g. aanalyze_in_context(chat), on the event loop of the analyzer without blocking.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+
+    def close(self):
+        with self._loop_lock:
+            if self._loop:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+    def _wait(self, future):
+        try:
+            future.result()
+        except concurrent.futures.CancelledError:
+            logger.info("LLM analysis was superseded by a newer utterance")
+
+    async def _analyze(self, chat, prompt):
+        task = asyncio.current_task()
+        utterance = chat.last_utterance
+        # ChatAnalyzer passes a new view on the chat for each utterance
+        key = getattr(chat, '_view_chat', chat)
+
+        previous = self._pending.get(key)
+        if previous is not None and not previous.done():
+            logger.debug("Cancel superseded LLM analysis in chat %s", chat.id)
+            previous.get_loop().call_soon_threadsafe(previous.cancel)
+        self._pending[key] = task
+
+        try:
+            timeout = self._timeout if self._timeout > 0 else None
+            on_triple = lambda triple: self._add_triples(chat, utterance, [triple])
+            await asyncio.wait_for(self._aextract_triples(prompt, on_triple), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Discarded LLM analysis of '%s', exceeded timeout of %s",
+                           utterance.transcript, self._timeout)
+        finally:
+            if self._pending.get(key) is task:
+                del self._pending[key]
+
+    async def _aextract_triples(self, prompt, on_triple):
+        start = time.time()
+        triples = []
+        attempt = 0
+        max=3
+        while not triples and attempt<max:
+            attempt += 1
+            if self._stream:
+                triples = await self._astream_triples(prompt, on_triple)
+            else:
+                triples = [triple for triple_value in self._parse_triples(await self._ainvoke(prompt))
+                           for triple in on_triple(triple_value)]
+        self.stats.record(attempt, bool(triples), time.time() - start)
+
+        return triples
+
+    async def _astream_triples(self, prompt, on_triple):
+        parser = TripleStreamParser()
+        triples = []
+
+        def emit(completed):
+            for triple in completed:
+                triples.extend(on_triple(triple))
+
+        async def generate():
+            async with self._get_semaphore():
+                async for chunk in self._agenerate_stream(prompt):
+                    emit(parser.feed(chunk))
+            emit(parser.close())
+
+            return parser.text
+
+        if not self._cache:
+            await generate()
+        else:
+            content = await self._cache.aget_or_call(self._cache_key(prompt), generate,
+                                                     accept=lambda content: bool(triples))
+            if not parser.text:
+                # Answered from the cache or by a concurrent request
+                emit(self._parse_triples(content))
+
+        return triples
+
+    async def _ainvoke(self, prompt):
+        if not self._cache:
+            return await self._agenerate(prompt)
+
+        return await self._cache.aget_or_call(self._cache_key(prompt), lambda: self._agenerate(prompt),
+                                              accept=self._has_complete_triples)
+
+    async def _agenerate(self, prompt):
+        async with self._get_semaphore():
+            if self._backend == LLAMA_CPP:
+                completion = await self._allama_client.chat.completions.create(**self._llama_request(prompt))
+                self._record_usage(completion)
+
+                return completion.choices[0].message.content
+
+            response = await self._llm.ainvoke(prompt)
+            self._record_usage(response)
+
+            return response.content
+
+    async def _agenerate_stream(self, prompt):
+        if self._backend == LLAMA_CPP:
+            completion = await self._allama_client.chat.completions.create(**self._llama_request(prompt, stream=True))
+            async for chunk in completion:
+                self._record_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        else:
+            async for chunk in self._llm.astream(prompt):
+                self._record_usage(chunk)
+                yield chunk.content
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+
+        return self._semaphores[loop]
+
+    def _get_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name="AsyncLLMAnalyzer", daemon=True)
+                thread.start()
+
+            return self._loop
+
+
 if __name__ == "__main__":
     '''
     test files with triples are formatted like so "test sentence : subject predicate object" 
@@ -88,15 +88,16 @@ class ArgumentExtraction(torch.nn.Module):
                 input_ids.append(self._tokenizer.encode(t, add_special_tokens=False))
             else:
                 input_ids.append([self._tokenizer.sep_token_id])
-        #print(self._sep, self._tokenizer.eos_token_id, 'input_ids', input_ids)
         # Flatten input_ids
-        f_input_ids = torch.LongTensor([[i for ids in input_ids for i in ids]]).to(self._device)
+        f_input_ids = np.fromiter((i for ids in input_ids for i in ids), dtype=np.int64)
+        f_input_ids = torch.from_numpy(f_input_ids).unsqueeze(0).to(self._device)
 
         # Determine how often we need to repeat the labels
         repeats = [len(ids) for ids in input_ids]
 
-        # Set speaker IDs
-        speaker_ids = [0] + [tokens[:i + 1].count(self._sep) % 2 for i in range(len(tokens))][:-1]  # TODO: make pretty
+        # Set speaker IDs: parity of the number of separators up to and including the previous token
+        is_sep = np.fromiter((t == self._sep for t in tokens), dtype=np.int64, count=len(tokens))
+        speaker_ids = np.concatenate(([0], np.cumsum(is_sep)[:-1] % 2))
         speaker_ids = self._repeat_speaker_ids(speaker_ids, repeats)
 
         return f_input_ids, speaker_ids, repeats
@@ -104,8 +105,8 @@ class ArgumentExtraction(torch.nn.Module):
     def _repeat_speaker_ids(self, speaker_ids, repeats):
         """ Repeats speaker IDs for oov tokens.
         """
-        rep_speaker_ids = np.array(np.repeat([0] + list(speaker_ids), repeats=repeats))
-        return torch.LongTensor(rep_speaker_ids).to(self._device)
+        rep_speaker_ids = np.repeat(np.concatenate(([0], speaker_ids)).astype(np.int64), repeats=repeats)
+        return torch.from_numpy(rep_speaker_ids).to(self._device)
 
     def _repeat_labels(self, labels, repeats):
         """ Repeats BIO labels for OOV tokens. Ensure B-labeled tokens are repeated
@@ -172,10 +173,11 @@ class ArgumentExtraction(torch.nn.Module):
         # Invert tokenization for viewing
         subwords = self._tokenizer.convert_ids_to_tokens(input_ids[0])
         # Forward-pass
-        predictions = self(input_ids, speaker_ids)
-        subjs = predictions[0].cpu().detach().numpy()[0]
-        preds = predictions[1].cpu().detach().numpy()[0]
-        objs = predictions[2].cpu().detach().numpy()[0]
+        with torch.no_grad():
+            predictions = self(input_ids, speaker_ids)
+        subjs = predictions[0].cpu().numpy()[0]
+        preds = predictions[1].cpu().numpy()[0]
+        objs = predictions[2].cpu().numpy()[0]
 
         # Decode predictions into strings
         subj_args = bio_tags_to_tokens(subwords, subjs.T, one_hot=True)
@@ -10,7 +10,7 @@ from cltl.triple_extraction.conversational_triples.post_processing import PostPr
 from cltl.triple_extraction.conversational_triples.utils import pronoun_to_speaker,pronoun_to_speaker_id,  speaker_id_to_speaker, \
     bio_tags_to_tokens
 from itertools import product
-import spacy
+from cltl.triple_extraction.nlp.spacy_models import load_spacy, TOKENIZER
 
 import logging
 
@@ -19,24 +19,26 @@ logger = logging.getLogger(__name__)
 
 class AlbertTripleExtractor:
     def __init__(self, path: object, max_triples: int = 0, base_model: object = 'albert-base-v2',
-                 lang: object = "en") -> object:
+                 lang: object = "en", scoring_head: str = 'cross') -> object:
         """ Constructor of the Albert-based Triple Extraction Pipeline.
 
         :param path:       path to savefile
         :param base_model: base model (default: albert-base-v2)
+        :param scoring_head: candidate scoring head, 'cross' or 'late' (see TripleScoring)
         :param sep:        separator token used to delimit dialogue turns (default: <eos>)
         :param speaker1:   name of user (default: speaker1)
         :param speaker2:   name of system (default: speaker2)
         """
         logger.debug("Loading model %s", path)
         self._argument_module = ArgumentExtraction(base_model, path=path)
-        self._scoring_module = TripleScoring(base_model, path=path)
+        self._scoring_module = TripleScoring(base_model, path=path, head=scoring_head)
         self._base_model = base_model
         self._post_processor = PostProcessor()
+        # Only the tokenizer is used
         if lang == "nl":
-            self._nlp = spacy.load('nl_core_news_sm')
+            self._nlp = load_spacy('nl_core_news_sm', TOKENIZER)
         else:
-            self._nlp = spacy.load('en_core_web_sm')
+            self._nlp = load_spacy('en_core_web_sm', TOKENIZER)
 
         self._sep = self._argument_module._tokenizer.decode(self._argument_module._tokenizer.sep_token_id)
 
@@ -137,15 +139,18 @@ class AlbertTripleExtractor:
     #     print('Predicates:', bio_tags_to_tokens(subwords, y_pred.T, one_hot=True))
     #     print('Objects:   ', bio_tags_to_tokens(subwords, y_obj.T, one_hot=True))
 
-    def extract_triples(self, speakers, dialog, human, agent, post_process=True, batch_size=32, verbose=False):
+    def extract_triples(self, speakers, dialog, human, agent, post_process=True, batch_size=32, threshold=0.0,
+                        verbose=False):
         """
         :param dialog:       separator-delimited dialogue
         :param human:       speaker of odd turns
         :param human:       speaker of even turns
         :param post_process: Whether to apply rules to fix contractions and strip auxiliaries (like baselines)
         :param batch_size:   If a lot of possible triples exist, batch up processing
+        :param threshold:    Minimum confidence of the returned triples, applied before post-processing
         :param verbose:      whether to print messages (True) or be silent (False) (default: False)
-        :return:             A list of confidence-triple pairs of the form (confidence, (subj, pred, obj, polarity))
+        :return:             A list of confidence-triple pairs of the form (confidence, (subj, pred, obj, polarity)),
+                             sorted by confidence and limited to max_triples
         """
         # Assign unambiguous tokens to you/I
         tokens = self._tokenize_with_speakers(dialog, speakers, human, agent)
@@ -172,30 +177,35 @@ class AlbertTripleExtractor:
         if self._max_triples > 0:
             candidates = candidates[:int(math.ceil(self._max_triples / batch_size)) * batch_size]
 
-        # Score candidate triples
-        predictions = []
-        for i in range(0, len(candidates), batch_size):
-            batch = candidates[i:i + batch_size]
-            for y_hat in self._scoring_module.predict(tokens, batch):
-                predictions.append(y_hat)
+        # Score candidate triples, encoding the dialogue only once for all candidates
+        dialogue = self._scoring_module.encode_dialogue(tokens)
+        # Bucket candidates of similar length, such that batches need little padding
+        order = sorted(range(len(candidates)), key=lambda idx: len(' '.join(candidates[idx])))
+        predictions = [None] * len(candidates)
+        for i in range(0, len(order), batch_size):
+            batch_idx = order[i:i + batch_size]
+            batch = [candidates[idx] for idx in batch_idx]
+            for idx, y_hat in zip(batch_idx, self._scoring_module.predict(tokens, batch, dialogue=dialogue)):
+                predictions[idx] = y_hat
         # Rank candidates according to entailment predictions
-        triples = []
+        scored = []
         for y_hat, (subj, pred, obj) in zip(predictions, candidates):
             pol = 'negative' if y_hat[2] > y_hat[1] else 'positive'
             ent = max(y_hat[1], y_hat[2])
-            # print('y_hat', y_hat, ent)
+            if ent >= threshold:
+                scored.append((ent, (subj, pred, obj), pol))
+        scored.sort(key=lambda x: -x[0])
+        if self._max_triples > 0:
+            scored = scored[:self._max_triples]
 
-            # Replace SPEAKER* with speaker
-            subj = speaker_id_to_speaker(subj, human, agent)
-            pred = speaker_id_to_speaker(pred, human, agent)
-            obj = speaker_id_to_speaker(obj, human, agent)
+        # Replace SPEAKER* with speaker
+        triples = [tuple(speaker_id_to_speaker(arg, human, agent) for arg in triple) for _, triple, _ in scored]
 
-            # Fix mistakes, expand contractions
-            if post_process:
-                subj, pred, obj = self._post_processor.format((subj, pred, obj))
-            triples.append((ent, (subj, pred, obj, pol)))
+        # Fix mistakes, expand contractions, only for the triples that are kept
+        if post_process and triples:
+            triples = self._post_processor.format_batch(triples)
 
-        return sorted(triples, key=lambda x: -x[0])
+        return [(ent, (subj, pred, obj, pol)) for (ent, _, pol), (subj, pred, obj) in zip(scored, triples)]
 
     def extract_triples_for_questions(self, speakers, dialog, human, agent):
         """
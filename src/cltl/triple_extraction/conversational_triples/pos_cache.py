@@ -0,0 +1,80 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class PhraseCache:
+    def __init__(self, maxsize=10000):
+        """ Bounded LRU cache for the spaCy analysis of short phrases.
+
+        Entries are keyed by (model, kind, phrase), such that a single instance can be
+        shared by post-processors for different languages.
+
+        :param maxsize: maximum number of cached phrases
+        """
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(phrase):
+        return ' '.join(phrase.split())
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, model, kind, phrase):
+        key = (model, kind, self.normalize(phrase))
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+        return value
+
+    def put(self, model, kind, phrase, value):
+        key = (model, kind, self.normalize(phrase))
+        with self._lock:
+            self._entries[key] = tuple(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path):
+        """ Store the cached entries, least recently used first, as warm-start file.
+        """
+        with self._lock:
+            entries = [[model, kind, phrase, list(value)] for (model, kind, phrase), value in self._entries.items()]
+
+        with open(path, 'w') as file:
+            json.dump(entries, file)
+        logger.info("Saved %s cached phrases to %s", len(entries), path)
+
+    def load(self, path):
+        """ Add the entries of a warm-start file to the cache.
+        """
+        with open(path) as file:
+            entries = json.load(file)
+
+        for model, kind, phrase, value in entries:
+            self.put(model, kind, phrase, value)
+        logger.info("Loaded %s cached phrases from %s", len(entries), path)
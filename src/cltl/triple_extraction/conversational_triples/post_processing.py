@@ -1,7 +1,11 @@
-import spacy
+import os
 import re
 import json
 import importlib.resources
+from collections import OrderedDict
+
+from cltl.triple_extraction.conversational_triples.pos_cache import PhraseCache
+from cltl.triple_extraction.nlp.spacy_models import load_spacy, TAGGER
 
 # Rules to map different OIE outputs to the same standard
 PRED_RULES = {'VERB PART VERB': [0, 1],           # "want to go"
@@ -27,12 +31,30 @@ AUXILIARIES = ["am", "'m", "' m", "are", "is", "was", "do", "does", "did", "'ll"
 
 
 class PostProcessor:
-    def __init__(self):
-        self._nlp = spacy.load('en_core_web_sm')
+    MODEL = 'en_core_web_sm'
+    LEXICON = "predicate_norm.json"
+    PRONOUN = "I"
+    # POS tags and tokens of phrases, shared by all post-processors
+    CACHE = PhraseCache()
+
+    def __init__(self, cache_file=None):
+        """
+        :param cache_file: optional warm-start file for the phrase cache (see save_cache)
+        """
+        self._nlp = load_spacy(self.MODEL, TAGGER)
 
-        with importlib.resources.open_text("cltl.triple_extraction.conversational_triples", "predicate_norm.json") as file:
-           # print(file.name)
-            self._predicate_norm_lex= json.load(file)
+        with importlib.resources.open_text("cltl.triple_extraction.conversational_triples", self.LEXICON) as file:
+            self._predicate_norm_lex = json.load(file)
+
+        if cache_file and os.path.exists(cache_file):
+            self.CACHE.load(cache_file)
+
+    def save_cache(self, path):
+        """ Save the phrase cache as warm-start file, including the phrases from the predicate lexicon.
+        """
+        phrases = set(self._predicate_norm_lex.keys()) | set(self._predicate_norm_lex.values())
+        self._analyze([(kind, phrase) for phrase in phrases for kind in ('tags', 'tokens')])
+        self.CACHE.save(path)
 
     @staticmethod
     def _decontract(phrase, is_predicate=False):
@@ -59,124 +81,89 @@ class PostProcessor:
         # Remove double spaces if any
         return re.sub(' +', ' ', phrase.strip())
 
-    def _pos_sequence(self, predicate):
-        """ Returns the POS sequence of a given predicate string. We add
-            token "I" and "things" to ensure correct POS sequence.
+    def _pos_context(self, phrase):
+        """ Puts a phrase between the pronoun and token "things" to ensure a correct POS sequence.
         """
-        pos_seq = []
-        for token in self._nlp("I " + predicate.strip() + " things"):
-            tag = 'AUX' if token.tag_ == 'MD' else token.pos_  # Ensure backwards compatibility with SpaCy v2
-            pos_seq.append(tag)
-        return pos_seq[1:-1]
-
-    def format(self, triple):
-        # Fix contractions
-        subj = self._decontract(triple[0])
-        pred = self._decontract(triple[1], is_predicate=True)
-        obj = self._decontract(triple[2])
-
-        # Get token sequence of arguments
-        pred_tags = self._pos_sequence(pred)
-        obj_tags = self._pos_sequence(obj)
-        pred = [t.lower_ for t in self._nlp(pred)]
-        obj = [t.lower_ for t in self._nlp(obj)]
-
-        # Remove auxiliaries if there is a following verb or auxiliary
-        if len(pred) > 1 and pred_tags[1] in ['AUX', 'VERB', 'INTJ']:
-            if pred[0] in AUXILIARIES:
-                pred = pred[1:]
-                pred_tags = self._pos_sequence(' '.join(pred))
-
-        # Move 'to' back to predicate if in object
-        if obj_tags[0] in ['PART', 'ADP'] and len(obj) > 1:
-            pred = pred + [obj.pop(0)]
-            pred_tags = self._pos_sequence(' '.join(pred))
-
-        # Simplify predicate by moving parts to object (for baselines)
-        for rule, pred_idx in PRED_RULES.items():
-            if ' '.join(pred_tags).startswith(rule):
-                obj = [t for i, t in enumerate(pred) if i not in pred_idx] + obj
-                pred = [t for i, t in enumerate(pred) if i in pred_idx]
-                break
-
-        pred = ' '.join(pred)
-        obj = ' '.join(obj)
-
-        # Common error by SpaCy
-        if pred.startswith('do like'):
-            pred = pred[3:]
-
-        if pred in self._predicate_norm_lex:
-            pred = self._predicate_norm_lex[pred]
-        return subj, pred, obj
-
+        return self.PRONOUN + " " + phrase.strip() + " things"
 
-class PostProcessorNL:
-    def __init__(self):
-        self._nlp = spacy.load('nl_core_news_sm')
+    @staticmethod
+    def _pos_tags(doc):
+        """ Returns the POS sequence of a phrase parsed in its _pos_context.
+        """
+        # Ensure backwards compatibility with SpaCy v2
+        return ['AUX' if token.tag_ == 'MD' else token.pos_ for token in doc][1:-1]
 
-        with importlib.resources.open_text("cltl.triple_extraction.conversational_triples", "predicate_norm_nl.json") as file:
-           # print(file.name)
-            self._predicate_norm_lex= json.load(file)
+    def _analyze(self, requests):
+        """ Returns the POS sequence ('tags') or lower-cased tokens ('tokens') for a list of (kind, phrase) requests.
 
-    @staticmethod
-    def _decontract(phrase, is_predicate=False):
-        # Decontract of common contractions and fragments
-        phrase = re.sub(r"'\s*l\s*l", "'ll", phrase) # optional spaces
-        phrase = re.sub(r"'\s*r\s*e", "'re", phrase)
-        phrase = re.sub(r"'\s*v\s*e", "'ve", phrase)
-        phrase = re.sub(r"n't", " not", phrase)
-        phrase = re.sub(r"'t", " not", phrase)
-        phrase = re.sub(r"'re", " are", phrase)
-        phrase = re.sub(r"'d", " would", phrase)
-        phrase = re.sub(r"' d", " would", phrase)
-        phrase = re.sub(r"'ll", " will", phrase)
-        phrase = re.sub(r"'ve", " have", phrase)
-        phrase = re.sub(r"'m", " am", phrase)
-        phrase = re.sub(r"' m", " am", phrase)
-        phrase = re.sub(r" wo ", "will ", ' ' + phrase + ' ')
-        phrase = re.sub(r" ca ", "can ", ' ' + phrase + ' ')
+        Phrases that are not cached are parsed in a single nlp.pipe call.
+        """
+        results = [self.CACHE.get(self.MODEL, kind, phrase) for kind, phrase in requests]
 
-        # 's in predicate is always 'to be'
-        if is_predicate:
-            phrase = re.sub(r"\'s", " is", phrase)
+        missing = list(OrderedDict.fromkeys((kind, PhraseCache.normalize(phrase))
+                                            for (kind, phrase), result in zip(requests, results) if result is None))
+        texts = [self._pos_context(phrase) if kind == 'tags' else phrase for kind, phrase in missing]
+        parsed = {}
+        for (kind, phrase), doc in zip(missing, self._nlp.pipe(texts)):
+            value = self._pos_tags(doc) if kind == 'tags' else [t.lower_ for t in doc]
+            self.CACHE.put(self.MODEL, kind, phrase, value)
+            parsed[(kind, phrase)] = tuple(value)
 
-        # Remove double spaces if any
-        return re.sub(' +', ' ', phrase.strip())
+        return [list(result if result is not None else parsed[(kind, PhraseCache.normalize(phrase))])
+                for (kind, phrase), result in zip(requests, results)]
 
     def _pos_sequence(self, predicate):
         """ Returns the POS sequence of a given predicate string. We add
             token "I" and "things" to ensure correct POS sequence.
         """
-        pos_seq = []
-        for token in self._nlp("ik " + predicate.strip() + " things"):
-            tag = 'AUX' if token.tag_ == 'MD' else token.pos_  # Ensure backwards compatibility with SpaCy v2
-            pos_seq.append(tag)
-        return pos_seq[1:-1]
+        return self._analyze([('tags', predicate)])[0]
 
     def format(self, triple):
-        # Fix contractions
-        subj = self._decontract(triple[0])
-        pred = self._decontract(triple[1], is_predicate=True)
-        obj = self._decontract(triple[2])
-
-        # Get token sequence of arguments
-        pred_tags = self._pos_sequence(pred)
-        obj_tags = self._pos_sequence(obj)
-        pred = [t.lower_ for t in self._nlp(pred)]
-        obj = [t.lower_ for t in self._nlp(obj)]
-
-        # Remove auxiliaries if there is a following verb or auxiliary
-        if len(pred) > 1 and pred_tags[1] in ['AUX', 'VERB', 'INTJ']:
-            if pred[0] in AUXILIARIES:
-                pred = pred[1:]
-                pred_tags = self._pos_sequence(' '.join(pred))
-
-        # Move 'to' back to predicate if in object
-        if obj_tags[0] in ['PART', 'ADP'] and len(obj) > 1:
-            pred = pred + [obj.pop(0)]
-            pred_tags = self._pos_sequence(' '.join(pred))
+        return self.format_batch([triple])[0]
 
+    def format_batch(self, triples):
+        """ Fixes contractions and simplifies the predicates of a batch of triples.
+
+        Phrases are looked up in the shared phrase cache, the remaining spaCy calls for the batch
+        are made through (at most) two nlp.pipe calls.
+        """
+        triples = [(self._decontract(triple[0]),
+                    self._decontract(triple[1], is_predicate=True),
+                    self._decontract(triple[2]))
+                   for triple in triples]
+
+        # Get POS tags and token sequence of arguments
+        analyzed = self._analyze([request for _, pred, obj in triples
+                                  for request in (('tags', pred), ('tags', obj), ('tokens', pred), ('tokens', obj))])
+
+        edited = []
+        for i, (subj, pred, obj) in enumerate(triples):
+            pred_tags, obj_tags, pred, obj = analyzed[4 * i:4 * i + 4]
+            changed = False
+
+            # Remove auxiliaries if there is a following verb or auxiliary
+            if len(pred) > 1 and pred_tags[1] in ['AUX', 'VERB', 'INTJ']:
+                if pred[0] in AUXILIARIES:
+                    pred = pred[1:]
+                    changed = True
+
+            # Move 'to' back to predicate if in object
+            if obj_tags[0] in ['PART', 'ADP'] and len(obj) > 1:
+                pred = pred + [obj.pop(0)]
+                changed = True
+
+            edited.append((subj, pred, obj, pred_tags, changed))
+
+        # Re-tag predicates that were edited
+        retag = [i for i, (_, _, _, _, changed) in enumerate(edited) if changed]
+        retagged = self._analyze([('tags', ' '.join(edited[i][1])) for i in retag])
+        pred_tags = [tags for _, _, _, tags, _ in edited]
+        for i, tags in zip(retag, retagged):
+            pred_tags[i] = tags
+
+        return [self._simplify(subj, pred, obj, tags) for (subj, pred, obj, _, _), tags in zip(edited, pred_tags)]
+
+    def _simplify(self, subj, pred, obj, pred_tags):
         # Simplify predicate by moving parts to object (for baselines)
         for rule, pred_idx in PRED_RULES.items():
             if ' '.join(pred_tags).startswith(rule):
@@ -195,6 +182,13 @@ class PostProcessorNL:
             pred = self._predicate_norm_lex[pred]
         return subj, pred, obj
 
+
+class PostProcessorNL(PostProcessor):
+    MODEL = 'nl_core_news_sm'
+    LEXICON = "predicate_norm_nl.json"
+    PRONOUN = "ik"
+
+
 if __name__ == '__main__':
     pp = PostProcessor()
     print(pp.format(('speaker1', "' v e got", 'some great news for speaker2')))
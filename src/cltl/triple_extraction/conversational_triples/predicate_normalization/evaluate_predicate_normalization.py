@@ -41,8 +41,7 @@ def evaluate(normalizer, test_triples, test_labels):
     """ Evaluates predicate normalization and disambiguation.
     """
     pred_labels = []
-    for i, triple in enumerate(test_triples):
-        norm_pred, conf = normalizer.normalize(*triple)
+    for i, (triple, (norm_pred, conf)) in enumerate(zip(test_triples, normalizer.normalize_batch(test_triples))):
         pred_labels.append(norm_pred)
         print('%s (%s)' % (triple, conf))
         print('True:', test_labels[i])
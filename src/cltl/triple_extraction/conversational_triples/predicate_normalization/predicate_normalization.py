@@ -1,12 +1,18 @@
+import hashlib
+import logging
+import os
+
 import torch
 import numpy as np
 from tqdm import tqdm
 from transformers import AutoTokenizer, AutoModel
-from sklearn.neighbors import KNeighborsClassifier
 
-import spacy
 from lemminflect import getInflection
 
+from cltl.triple_extraction.nlp.spacy_models import load_spacy, TAGGER
+
+logger = logging.getLogger(__name__)
+
 
 class BERT:
     def __init__(self, base_model='bert-base-uncased'):
@@ -30,44 +36,125 @@ class BERT:
         return input_ids, pred_idx
 
     def get_embedding(self, subj, pred, obj):
-        # Tokenize context and determine where the predicate comes from
-        triple_ids, pred_idx = self._tokenize(subj, pred, obj)
+        return self.get_embeddings([(subj, pred, obj)])[0]
+
+    def get_embeddings(self, triples, batch_size=64):
+        """ Mean embedding of the predicate tokens of each (subj, pred, obj) triple.
+
+        Triples are fed through the model in batches of similar length to limit padding.
+        """
+        tokenized = [self._tokenize(subj, pred, obj) for subj, pred, obj in triples]
+        order = sorted(range(len(tokenized)), key=lambda i: len(tokenized[i][0]))
+
+        embeddings = np.zeros((len(tokenized), self._model.config.hidden_size), dtype=np.float32)
+        with torch.no_grad():
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                max_len = max(len(tokenized[i][0]) for i in batch)
 
-        # Feed context through model
-        state = self._model(torch.LongTensor([triple_ids])).last_hidden_state
+                input_ids = np.full((len(batch), max_len), self._tokenizer.pad_token_id, dtype=np.int64)
+                attention_mask = np.zeros((len(batch), max_len), dtype=np.int64)
+                for row, i in enumerate(batch):
+                    triple_ids = tokenized[i][0]
+                    input_ids[row, :len(triple_ids)] = triple_ids
+                    attention_mask[row, :len(triple_ids)] = 1
 
-        # Get embeddings of predicate tokens
-        return torch.mean(state[0, pred_idx], dim=0).detach().numpy()
+                # Feed context through model
+                state = self._model(torch.from_numpy(input_ids),
+                                    attention_mask=torch.from_numpy(attention_mask)).last_hidden_state
+
+                # Get embeddings of predicate tokens
+                for row, i in enumerate(batch):
+                    embeddings[i] = torch.mean(state[row, tokenized[i][1]], dim=0).numpy()
+
+        return embeddings
 
 
 class PredicateNormalizer:
-    def __init__(self, exemplar_file, base_model='bert-base-uncased', k=3, min_conf=0.4):
+    def __init__(self, exemplar_file, base_model='bert-base-uncased', k=3, min_conf=0.4, cache_dir=None):
+        """ Normalizes predicates to the label of their nearest exemplars.
+
+        :param exemplar_file: file with lines 'normalized predicate, subject, predicate, object'
+        :param base_model: model used to embed the predicates
+        :param k: number of nearest exemplars
+        :param min_conf: minimum confidence to normalize to an exemplar label
+        :param cache_dir: directory of the cached exemplar embeddings, defaults to the directory of the exemplar file.
+            If the embeddings can't be written to it, e.g. as the package is installed read-only, they are
+            computed again on the next start.
+        """
+        self._base_model = base_model
         self._model = BERT(base_model)
-        self._nlp = spacy.load('en_core_web_sm')
-        self._knn = KNeighborsClassifier(n_neighbors=k, metric=self._cosine_dist, weights='distance', algorithm='brute')
-        self._fit_knn(exemplar_file)
+        self._nlp = load_spacy('en_core_web_sm', TAGGER)
+        self._k = k
         self._min_conf = min_conf
+        self._fit_knn(exemplar_file, cache_dir)
 
-    def _fit_knn(self, path):
+    def _fit_knn(self, path, cache_dir=None):
         print('\t- Fitting kNN')
-        X, y = [], []
-        with open(path, 'r', encoding='utf-8') as file:
-            for i, line in tqdm(enumerate(file)):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    try:
-                        norm_pred, subj, pred, obj = [t.strip() for t in line.strip().split(',')]
-                        # Precompute embeddings
-                        X.append(self._model.get_embedding(subj, pred, obj))
-                        y.append(norm_pred)
-                    except:
-                        print('Error in line %s: %s' % (i, line))
-        self._knn.fit(X, y)
+        with open(path, 'rb') as file:
+            content = file.read()
+
+        cache_file = self._cache_file(path, content, cache_dir)
+        if os.path.isfile(cache_file):
+            cached = np.load(cache_file)
+            X, y = cached['X'], cached['y']
+            print('\t- Loaded %s exemplar embeddings from %s' % (len(y), cache_file))
+        else:
+            exemplars, y = self._load_exemplars(content.decode('utf-8'))
+            X = self._model.get_embeddings(tqdm(exemplars))
+            y = np.array(y)
+            try:
+                np.savez(cache_file, X=X, y=y)
+            except OSError as e:
+                logger.warning("Couldn't cache exemplar embeddings in %s, pass a writable cache_dir: %s",
+                               cache_file, e)
+
+        # Unit vectors, such that cosine similarity is a matrix product
+        self._X = X / np.linalg.norm(X, axis=1, keepdims=True)
+        self.classes_, self._y = np.unique(y, return_inverse=True)
+
+    def _cache_file(self, path, content, cache_dir):
+        cache_dir = cache_dir if cache_dir else os.path.dirname(os.path.abspath(path))
+        name = os.path.splitext(os.path.basename(path))[0]
+        model = self._base_model.replace('/', '_')
+        digest = hashlib.sha1(content).hexdigest()[:16]
+
+        return os.path.join(cache_dir, '%s.%s.%s.npz' % (name, model, digest))
 
     @staticmethod
-    def _cosine_dist(x, y):
-        sim = x.dot(y) / (np.linalg.norm(x) * np.linalg.norm(y))
-        return 1 - sim
+    def _load_exemplars(content):
+        exemplars, y = [], []
+        for i, line in enumerate(content.splitlines()):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                try:
+                    norm_pred, subj, pred, obj = [t.strip() for t in line.strip().split(',')]
+                    exemplars.append((subj, pred, obj))
+                    y.append(norm_pred)
+                except:
+                    print('Error in line %s: %s' % (i, line))
+
+        return exemplars, y
+
+    def _predict_proba(self, X):
+        """ Distance weighted kNN class probabilities with cosine distance. """
+        X = X / np.linalg.norm(X, axis=1, keepdims=True)
+        dist = 1 - X @ self._X.T
+
+        k = min(self._k, len(self._y))
+        neighbors = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        neighbor_dist = np.take_along_axis(dist, neighbors, axis=1)
+
+        # Weight by inverse distance, exact matches take all weight
+        with np.errstate(divide='ignore'):
+            weights = 1 / neighbor_dist
+        exact = neighbor_dist <= 0
+        weights[exact.any(axis=1)] = exact[exact.any(axis=1)]
+
+        probs = np.zeros((len(X), len(self.classes_)))
+        np.add.at(probs, (np.arange(len(X))[:, None], self._y[neighbors]), weights)
+
+        return probs / probs.sum(axis=1, keepdims=True)
 
     def _normalize_surface_form(self, pred):
         pred_tokens = []
@@ -85,22 +172,35 @@ class PredicateNormalizer:
         return '_'.join(pred_tokens)
 
     def normalize(self, subj, pred, obj):
+        return self.normalize_batch([(subj, pred, obj)])[0]
+
+    def normalize_batch(self, triples):
+        """ Normalize the predicates of a list of (subj, pred, obj) triples.
+
+        :return: list of (normalized predicate, confidence) tuples
+        """
+        if not triples:
+            return []
+
         # Get contextual embedding of predicate
-        x = self._model.get_embedding(subj, pred, obj)
+        X = self._model.get_embeddings(triples)
 
         # Compute probability of each normalized predicate
-        probs = self._knn.predict_proba([x])[0]
+        probs = self._predict_proba(X)
 
         # Identify normalized predicate with the highest likelihood
-        i = np.argmax(probs)
+        best = np.argmax(probs, axis=1)
 
-        # Normalize only above minimum confidence
-        if probs[i] > self._min_conf:
-            return self._knn.classes_[i], probs[i]
+        normalized = []
+        for (_, pred, _), i, prob in zip(triples, best, probs):
+            # Normalize only above minimum confidence
+            if prob[i] > self._min_conf:
+                normalized.append((self.classes_[i], prob[i]))
+            else:
+                # If no match is found, map predicate to 3rd-person singular
+                normalized.append((self._normalize_surface_form(pred), prob[i]))
 
-        # If no match is found, map predicate to 3rd-person singular
-        pred = self._normalize_surface_form(pred)
-        return pred, probs[i]
+        return normalized
 
 
 if __name__ == '__main__':
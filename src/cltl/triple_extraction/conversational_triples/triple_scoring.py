@@ -1,28 +1,49 @@
 import glob
+import logging
+import os
 import random
+from collections import namedtuple
 
 import numpy as np
 import torch
 from tqdm import tqdm
 from transformers import AutoTokenizer, AutoModel, AutoConfig
 # Capture errors
-from transformers import logging
+from transformers import logging as trans_log
 
 from cltl.triple_extraction.conversational_triples.utils import load_annotations, extract_triples
 
-logging.set_verbosity(40)
+trans_log.set_verbosity(40)
+logger = logging.getLogger(__name__)
+
+
+# Dialogue context of an utterance, encoded once and shared by all of its candidate triples
+DialogueEncoding = namedtuple('DialogueEncoding', ['input_ids', 'speaker_ids', 'hidden'])
 
 
 class TripleScoring(torch.nn.Module):
-    def __init__(self, base_model='albert-base-v2', path=None, max_len=80, sep='<eos>'):
+    def __init__(self, base_model='albert-base-v2', path=None, max_len=80, sep='<eos>', head='cross'):
+        """ Init model with a candidate scoring head.
+
+            params:
+            str base_model: Transformer architecture to use (default: albert-base-v2)
+            str path:       Path to pretrained model
+            str head:       'cross' runs dialogue + triple jointly through the transformer for every candidate,
+                            'late' encodes the dialogue once per utterance and scores each candidate against
+                            it with a late-interaction head (requires a model trained with head='late' in path)
+        """
         super().__init__()
+        if head not in ('cross', 'late'):
+            raise ValueError("Unsupported scoring head: " + str(head))
         # Base model
         print('Loading %s for triple scoring' % base_model)
         # Load base model
         self._model = AutoModel.from_pretrained(base_model)
         self._max_len = max_len
+        self._path = path
         self._base = base_model
         self._sep = sep
+        self._head_type = head
 
         # Load and extend tokenizer with SPEAKERS
         self._tokenizer = AutoTokenizer.from_pretrained(base_model)
@@ -34,6 +55,8 @@ class TripleScoring(torch.nn.Module):
         # SPO candidate scoring head
         hidden_size = AutoConfig.from_pretrained(base_model).hidden_size
         self._head = torch.nn.Linear(hidden_size, 3)
+        # Late-interaction head over [triple; aligned dialogue; triple * aligned dialogue]
+        self._late_head = torch.nn.Linear(3 * hidden_size, 3) if head == 'late' else None
         self._relu = torch.nn.ReLU()
         self._softmax = torch.nn.Softmax(dim=-1)
 
@@ -52,6 +75,24 @@ class TripleScoring(torch.nn.Module):
             state_dict = torch.load(model_path, map_location=self._device)
             self.load_state_dict(state_dict, strict=False)
 
+            if head == 'late':
+                self._load_late_head(path)
+
+    def _late_head_path(self, path):
+        name = self._base[self._base.rindex("/") + 1:] if "/" in self._base else self._base
+        return os.path.join(path, 'candidate_scorer_late_' + name + '.pt')
+
+    def _load_late_head(self, path):
+        model_path = self._late_head_path(path)
+        if not os.path.exists(model_path):
+            # Scoring with the untrained late-interaction head would silently produce random scores
+            raise FileNotFoundError("No late-interaction scorer found at %s, train it with "
+                                    "TripleScoring(head='late').fit() or use head='cross'" % model_path)
+
+        logger.info('Loading pretrained late-interaction scorer %s', model_path)
+        state_dict = torch.load(model_path, map_location=self._device)
+        self.load_state_dict(state_dict, strict=False)
+
     def forward(self, input_ids, speaker_ids, attn_mask):
         """ Computes the forward pass through the model
         """
@@ -59,6 +100,47 @@ class TripleScoring(torch.nn.Module):
         h = self._relu(out.last_hidden_state[:, 0])
         return self._softmax(self._head(h))
 
+    def _encode(self, input_ids, speaker_ids, attn_mask=None):
+        """ Contextual embeddings of a (batch of) token sequence(s)
+        """
+        return self._model(input_ids=input_ids, token_type_ids=speaker_ids, attention_mask=attn_mask).last_hidden_state
+
+    def _late_interaction(self, dialog_hidden, triple_hidden, triple_mask):
+        """ Scores a batch of encoded triples against a single encoded dialogue.
+
+            dialog_hidden: (dialogue_len, hidden), triple_hidden: (N, triple_len, hidden), triple_mask: (N, triple_len)
+        """
+        # Align each triple token with the dialogue tokens it attends to
+        sim = torch.matmul(triple_hidden, dialog_hidden.t()) / np.sqrt(dialog_hidden.shape[-1])
+        aligned = torch.matmul(torch.softmax(sim, dim=-1), dialog_hidden)
+
+        # Pool over (unpadded) triple tokens
+        mask = triple_mask.unsqueeze(-1)
+        length = mask.sum(dim=1).clamp(min=1)
+        t = (triple_hidden * mask).sum(dim=1) / length
+        a = (aligned * mask).sum(dim=1) / length
+
+        h = self._relu(torch.cat([t, a, t * a], dim=-1))
+        return self._softmax(self._late_head(h))
+
+    def encode_dialogue(self, tokens):
+        """ Encodes the dialogue context of an utterance once, such that it can be reused
+            for all of its candidate triples (see predict).
+
+            For the 'cross' head only the tokenization is reused, as the transformer must attend jointly
+            to the dialogue and each candidate; the 'late' head also reuses the contextual embeddings.
+        """
+        input_ids, speaker_ids = self._retokenize_dialogue(tokens)
+        if self._head_type != 'late':
+            return DialogueEncoding(input_ids, speaker_ids, None)
+
+        input_ids, speaker_ids = self._truncate_dialogue(input_ids, speaker_ids)
+
+        with torch.no_grad():
+            hidden = self._encode(torch.LongTensor([input_ids]).to(self._device),
+                                  torch.LongTensor([speaker_ids]).to(self._device))[0]
+        return DialogueEncoding(input_ids, speaker_ids, hidden)
+
     def _retokenize_dialogue(self, tokens, speaker=1):
         # Tokenize each token individually (keeping track of subwords)
         f_input_ids = [self._tokenizer.cls_token_id]
@@ -71,27 +153,52 @@ class TripleScoring(torch.nn.Module):
 
         return f_input_ids, speaker_ids
 
+    def _truncate_dialogue(self, input_ids, speaker_ids):
+        """ Cuts off a standalone dialogue at max_len, as the combined sequence for the 'cross' head,
+            and at the maximum length supported by the model
+        """
+        limit = min(self._max_len, self._model.config.max_position_embeddings)
+        return input_ids[:limit], speaker_ids[:limit]
+
     def _retokenize_triple(self, triple):
         # Append triple
         f_input_ids = self._tokenizer.encode(' '.join(triple), add_special_tokens=False)
         speaker_ids = [0] * len(f_input_ids)
         return f_input_ids, speaker_ids
 
-    def _add_padding(self, sequence, pad_token):
-        # If sequence is too long, cut off end
-        sequence = sequence[:self._max_len]
+    def _retokenize_triples(self, triples):
+        """ Tokenizes triples as standalone sequences ([CLS] triple [SEP]) for the late-interaction head
+        """
+        input_ids = [self._tokenizer.encode(' '.join(triple), add_special_tokens=True) for triple in triples]
+        batch_input_ids, batch_attn_mask = self._pad_batch(input_ids, self._tokenizer.pad_token_id)
+
+        batch_input_ids = torch.from_numpy(batch_input_ids).to(self._device)
+        batch_attn_mask = torch.from_numpy(batch_attn_mask).to(self._device)
+        return batch_input_ids, torch.zeros_like(batch_input_ids), batch_attn_mask
 
-        # Pad remainder to max_len
-        padding = self._max_len - len(sequence)
-        new_sequence = sequence + [pad_token] * padding
+    def _pad_batch(self, sequences, pad_token):
+        """ Pads a batch of sequences to its longest member (cut off at max_len).
+
+            Returns the padded sequences and the attention mask as contiguous arrays of shape (N, longest).
+        """
+        lengths = [min(len(sequence), self._max_len) for sequence in sequences]
+        padded = np.full((len(sequences), max(lengths, default=0)), pad_token, dtype=np.int64)
+        attn_mask = np.zeros(padded.shape, dtype=np.float32)
+        for i, (sequence, length) in enumerate(zip(sequences, lengths)):
+            padded[i, :length] = sequence[:length]
+            attn_mask[i, :length] = 1
 
-        # Mask out [PAD] tokens
-        attn_mask = [1] * len(sequence) + [0] * padding
-        return new_sequence, attn_mask
+        return padded, attn_mask
 
-    def fit(self, tokens, triples, labels, epochs=2, lr=1e-6):
+    def fit(self, tokens, triples, labels, epochs=2, lr=1e-6, path=None):
         """ Fits the model to the annotations
+
+            The late-interaction scorer is saved to path, by default the path of the pretrained model,
+            from where it is loaded with head='late'.
         """
+        if self._head_type == 'late':
+            return self._fit_late(tokens, triples, labels, epochs=epochs, lr=lr, path=path)
+
         X = []
         for tokens, triple_lst, triple_labels in zip(tokens, triples, labels):
 
@@ -106,14 +213,14 @@ class TripleScoring(torch.nn.Module):
                 input_ids = dialog_input_ids[:-1] + [self._tokenizer.unk_token_id] + triple_input_ids
                 speakers = dialog_speakers[:-1] + [0] + triple_speakers
 
-                # Pad sequence with [PAD] to max_len
-                input_ids, _ = self._add_padding(input_ids, self._tokenizer.pad_token_id)
-                speakers, attn_mask = self._add_padding(speakers, 0)
+                # Cut off sequence at max_len
+                input_ids, attn_mask = self._pad_batch([input_ids], self._tokenizer.pad_token_id)
+                speakers, _ = self._pad_batch([speakers], 0)
 
                 # Push Tensor to GPU
-                input_ids = torch.LongTensor([input_ids]).to(self._device)
-                speakers = torch.LongTensor([speakers]).to(self._device)
-                attn_mask = torch.FloatTensor([attn_mask]).to(self._device)
+                input_ids = torch.from_numpy(input_ids).to(self._device)
+                speakers = torch.from_numpy(speakers).to(self._device)
+                attn_mask = torch.from_numpy(attn_mask).to(self._device)
                 label_ids = torch.LongTensor([label]).to(self._device)
 
                 X.append((input_ids, speakers, attn_mask, label_ids))
@@ -141,38 +248,86 @@ class TripleScoring(torch.nn.Module):
         # Save model to file
         torch.save(self.state_dict(), 'candidate_scorer_%s' % self._base)
 
-    def predict(self, tokens, triples):
-        # Re-tokenize dialogue
-        dialog_input_ids, dialog_speakers = self._retokenize_dialogue(tokens)
+    def _fit_late(self, tokens, triples, labels, epochs=2, lr=1e-6, path=None):
+        """ Fits the late-interaction head (and transformer) to the annotations, one dialogue at a time
+        """
+        X = []
+        for tokens, triple_lst, triple_labels in zip(tokens, triples, labels):
+            if not triple_lst:
+                continue
+            dialog_input_ids, dialog_speakers = self._truncate_dialogue(*self._retokenize_dialogue(tokens))
+            X.append((torch.LongTensor([dialog_input_ids]).to(self._device),
+                      torch.LongTensor([dialog_speakers]).to(self._device),
+                      self._retokenize_triples(triple_lst),
+                      torch.LongTensor(triple_labels).to(self._device)))
+
+        optimizer = torch.optim.Adam(self.parameters(), lr=lr)
+        criterion = torch.nn.CrossEntropyLoss()
+
+        for epoch in range(epochs):
+            random.shuffle(X)
+
+            losses = []
+            for dialog_ids, dialog_speakers, (triple_ids, triple_speakers, triple_mask), y in tqdm(X):
+                dialog_hidden = self._encode(dialog_ids, dialog_speakers)[0]
+                triple_hidden = self._encode(triple_ids, triple_speakers, triple_mask)
+                y_hat = self._late_interaction(dialog_hidden, triple_hidden, triple_mask)
+                loss = criterion(y_hat, y)
+                losses.append(loss.item())
+
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+
+            print("mean loss =", np.mean(losses))
+
+        # Save model to file next to the pretrained model
+        model_path = self._late_head_path(path or self._path or '.')
+        torch.save(self.state_dict(), model_path)
+        logger.info('Saved late-interaction scorer to %s', model_path)
+
+    def predict(self, tokens, triples, dialogue=None):
+        """ Predicts entailment (none, positive, negative) of each triple given the dialogue.
+
+            If the dialogue was already encoded with encode_dialogue, pass it as dialogue to
+            reuse it across batches of candidates of the same utterance.
+        """
+        if dialogue is None:
+            dialogue = self.encode_dialogue(tokens)
+
+        with torch.no_grad():
+            if self._head_type == 'late':
+                triple_ids, triple_speakers, triple_mask = self._retokenize_triples(triples)
+                triple_hidden = self._encode(triple_ids, triple_speakers, triple_mask)
+                label = self._late_interaction(dialogue.hidden, triple_hidden, triple_mask)
+            else:
+                label = self._predict_cross(dialogue, triples)
+
+        return label.cpu().numpy()
+
+    def _predict_cross(self, dialogue, triples):
+        dialog_input_ids, dialog_speakers = dialogue.input_ids, dialogue.speaker_ids
 
         batch_input_ids = []
         batch_speakers = []
-        batch_attn_mask = []
-
         for triple in triples:
             # Tokenize triple
             triple_input_ids, triple_speakers = self._retokenize_triple(triple)
 
             # Concatenate dialogue tokens, [UNK] and triple
-            input_ids = dialog_input_ids + [self._tokenizer.unk_token_id] + triple_input_ids
-            speakers = dialog_speakers + [0] + triple_speakers
-
-            # Pad sequence with [PAD] to max_len
-            input_ids, _ = self._add_padding(input_ids, self._tokenizer.pad_token_id)
-            speakers, attn_mask = self._add_padding(speakers, 0)
+            batch_input_ids.append(dialog_input_ids + [self._tokenizer.unk_token_id] + triple_input_ids)
+            batch_speakers.append(dialog_speakers + [0] + triple_speakers)
 
-            batch_input_ids.append(input_ids)
-            batch_speakers.append(speakers)
-            batch_attn_mask.append(attn_mask)
+        # Pad batch with [PAD] to its longest sequence
+        batch_input_ids, batch_attn_mask = self._pad_batch(batch_input_ids, self._tokenizer.pad_token_id)
+        batch_speakers, _ = self._pad_batch(batch_speakers, 0)
 
         # Push batches to GPU
-        batch_input_ids = torch.LongTensor(batch_input_ids).to(self._device)
-        batch_speakers = torch.LongTensor(batch_speakers).to(self._device)
-        batch_attn_mask = torch.FloatTensor(batch_attn_mask).to(self._device)
+        batch_input_ids = torch.from_numpy(batch_input_ids).to(self._device)
+        batch_speakers = torch.from_numpy(batch_speakers).to(self._device)
+        batch_attn_mask = torch.from_numpy(batch_attn_mask).to(self._device)
 
-        label = self(batch_input_ids, batch_speakers, batch_attn_mask)
-        label = label.cpu().detach().numpy()
-        return label
+        return self(batch_input_ids, batch_speakers, batch_attn_mask)
 
 
 if __name__ == '__main__':
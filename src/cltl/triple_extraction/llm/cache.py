@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    def __init__(self, maxsize=1024):
+        """ Bounded in-memory LRU storage for LLM responses.
+
+        :param maxsize: maximum number of stored responses
+        """
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    def __init__(self, path):
+        """ Persistent storage for LLM responses in a SQLite database, e.g. to share responses between evaluation runs.
+
+        :param path: database file, created if it doesn't exist
+        """
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL)")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+
+        return row[0] if row else None
+
+    def put(self, key, value):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                                     (key, value, time.time()))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    def __init__(self, backend=None):
+        """ Content-addressed cache for LLM responses.
+
+        Concurrent requests for the same key are coalesced: only the first request calls the LLM,
+        the others wait for its response.
+
+        :param backend: storage of the responses, defaults to a MemoryBackend
+        """
+        self._backend = backend if backend is not None else MemoryBackend()
+        self._in_flight = dict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(**request):
+        """ Key for a request, e.g. of its model, temperature and prompt messages.
+
+        All parameters must be JSON serializable.
+        """
+        content = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get_or_call(self, key, call, accept=None):
+        """ Cached response for the key, or the response of call().
+
+        :param key: request key, see :meth:`key`
+        :param call: function without arguments that generates the response string
+        :param accept: optional predicate on the response, rejected responses are returned but not stored
+        :return: the response
+        """
+        value = self._backend.get(key)
+        if value is not None:
+            self._hit()
+            return value
+
+        future, owner = self._register(key)
+        if not owner:
+            return future.result()
+
+        try:
+            # A request for the same key may have completed in the meantime
+            value = self._backend.get(key)
+            if value is None:
+                value = call()
+                if accept is None or accept(value):
+                    self._backend.put(key, value)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+        return value
+
+    async def aget_or_call(self, key, call, accept=None):
+        """ Asynchronous variant of :meth:`get_or_call`, where call is a coroutine function.
+
+        If the request that is awaited for the key is cancelled, waiting requests call the LLM themselves.
+        """
+        while True:
+            value = self._backend.get(key)
+            if value is not None:
+                self._hit()
+                return value
+
+            future, owner = self._register(key)
+            if owner:
+                break
+
+            try:
+                # Shielded, a cancelled waiter must not cancel the shared request
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        try:
+            value = self._backend.get(key)
+            if value is None:
+                value = await call()
+                if accept is None or accept(value):
+                    self._backend.put(key, value)
+            future.set_result(value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+        return value
+
+    def close(self):
+        self._backend.close()
+
+    def _hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def _register(self, key):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                logger.debug("Coalesced request %s", key)
+                return future, False
+
+            self.misses += 1
+            future = Future()
+            self._in_flight[key] = future
+
+            return future, True
+
+    def _release(self, key):
+        with self._lock:
+            del self._in_flight[key]
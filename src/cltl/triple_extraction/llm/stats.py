@@ -0,0 +1,67 @@
+import threading
+
+
+class LLMStats:
+    def __init__(self):
+        """ Counters of the LLM requests of an analyzer. """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.generations = 0
+            self.failures = 0
+            self.latency = 0.0
+            self.prompt_tokens = 0
+            self.cached_tokens = 0
+
+    def record(self, attempts, success, latency):
+        """ Record the extraction for a single utterance.
+
+        :param attempts: number of generations
+        :param success: if triples were extracted
+        :param latency: total time in seconds for all attempts
+        """
+        with self._lock:
+            self.requests += 1
+            self.generations += attempts
+            self.failures += 0 if success else 1
+            self.latency += latency
+
+    def record_tokens(self, prompt_tokens, cached_tokens):
+        """ Record the token usage of a single generation.
+
+        :param prompt_tokens: number of prompt tokens reported by the server
+        :param cached_tokens: number of prompt tokens answered from the prompt cache of the server, if reported
+        """
+        with self._lock:
+            self.prompt_tokens += prompt_tokens or 0
+            self.cached_tokens += cached_tokens or 0
+
+    @property
+    def retries(self):
+        return self.generations - self.requests
+
+    @property
+    def retry_rate(self):
+        return self.retries / self.requests if self.requests else 0.0
+
+    @property
+    def average_latency(self):
+        return self.latency / self.requests if self.requests else 0.0
+
+    @property
+    def prefix_hit_rate(self):
+        """ Fraction of the prompt tokens that were answered from the prompt cache. """
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def to_dict(self):
+        with self._lock:
+            return {"requests": self.requests, "generations": self.generations, "retries": self.retries,
+                    "failures": self.failures, "retry_rate": self.retry_rate, "average_latency": self.average_latency,
+                    "prompt_tokens": self.prompt_tokens, "cached_tokens": self.cached_tokens,
+                    "prefix_hit_rate": self.prefix_hit_rate}
+
+    def __repr__(self):
+        return "LLMStats(%s)" % ", ".join("%s=%s" % item for item in self.to_dict().items())
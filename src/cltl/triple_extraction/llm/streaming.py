@@ -0,0 +1,134 @@
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class TripleStreamParser:
+    def __init__(self, key="triples"):
+        """ Incremental parser for LLM responses of the form {"triples": [{...}, {...}]}.
+
+        Each triple object is returned as soon as it is closed in the response, without waiting for
+        the remainder of the response. On :meth:`close` an incomplete last triple is repaired if possible,
+        by dropping its incomplete last key-value pair.
+
+        :param key: key of the array that contains the triples
+        """
+        self._key_pattern = re.compile(r'"%s"\s*:\s*$' % re.escape(key))
+        self._text = ''
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        # Open containers as (bracket, start position, is the triples array)
+        self._stack = []
+
+    @property
+    def text(self):
+        return self._text
+
+    def feed(self, chunk):
+        """ Add the next chunk of the response.
+
+        :return: list of the triples completed by the chunk
+        """
+        self._text += chunk
+        triples = []
+
+        text = self._text
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                is_triples = char == '[' and self._key_pattern.search(text, max(0, pos - 64), pos) is not None
+                self._stack.append((char, pos, is_triples))
+            elif char in '}]' and self._stack:
+                _, start, _ = self._stack.pop()
+                if char == '}' and self._in_triples():
+                    triple = self._load(text[start:pos + 1])
+                    if triple is not None:
+                        triples.append(triple)
+        self._pos = len(text)
+
+        return triples
+
+    def close(self):
+        """ End of the response.
+
+        :return: list with the repaired incomplete last triple, if any
+        """
+        for depth, (bracket, start, _) in enumerate(self._stack):
+            if bracket == '{' and depth > 0 and self._stack[depth - 1][2]:
+                triple = self._repair(self._text[start:])
+                self._stack = []
+                return [triple] if triple is not None else []
+
+        self._stack = []
+
+        return []
+
+    def _in_triples(self):
+        return bool(self._stack) and self._stack[-1][2]
+
+    def _repair(self, fragment):
+        # Top level commas of the triple and the state at the end of the fragment
+        commas = []
+        depth = 0
+        in_string = escape = False
+        for idx, char in enumerate(fragment):
+            if in_string:
+                if escape:
+                    escape = False
+                elif char == '\\':
+                    escape = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+            elif char == ',' and depth == 1:
+                commas.append(idx)
+
+        # Keep the last key-value pair only if its value is a closed string, a truncated string, number or
+        # nested object is dropped instead of being completed to a wrong value
+        candidates = []
+        if not in_string and depth == 1 and fragment.rstrip().endswith('"'):
+            candidates.append(fragment + '}')
+        candidates += [fragment[:idx] + '}' for idx in reversed(commas)]
+
+        for candidate in candidates:
+            triple = self._load(candidate)
+            if triple is not None:
+                logger.debug("Repaired incomplete triple %s", fragment)
+                return triple
+
+        logger.debug("Failed to repair incomplete triple %s", fragment)
+
+        return None
+
+    @staticmethod
+    def _load(text):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return None
+
+        return value if isinstance(value, dict) else None
+
+
+def parse_triples(content, key="triples"):
+    """ Triples in a complete LLM response, repairing an incomplete last triple. """
+    parser = TripleStreamParser(key)
+
+    return parser.feed(content) + parser.close()
@@ -0,0 +1,133 @@
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from cltl.triple_extraction import logger
+
+
+class JavaSocketServer(object):
+    """
+    Long-running Java socket server of the Stanford tools (NERServer, MaxentTaggerServer).
+
+    The servers answer a single line per connection and close the connection after the response.
+    Batches are therefore sent as concurrent requests, limited by the number of connections.
+    """
+    IP = 'localhost'
+
+    def __init__(self, command, connections=4, startup_timeout=120, request_timeout=30):
+        """
+        Parameters
+        ----------
+        command: List[str]
+            Command to start the server, without the port option
+        connections: int
+            Maximum number of concurrent connections used for batches
+        startup_timeout: float
+            Seconds to wait for the server to accept connections
+        request_timeout: float
+            Seconds to wait for the connection and for each read of the response, after which a request
+            fails with a TimeoutError instead of blocking on an unresponsive server
+        """
+        self._log = logger.getChild(self.__class__.__name__)
+        self._port = self._find_free_port()
+        self._startup_timeout = startup_timeout
+        self._request_timeout = request_timeout
+        self._ready = threading.Event()
+        self._available = False
+        self._pool = ThreadPoolExecutor(max_workers=connections, thread_name_prefix=self.__class__.__name__)
+
+        try:
+            self._process = subprocess.Popen(command + ['-port', str(self._port)],
+                                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError:
+            self._log.exception("Couldn't start Java server %s. Do you have Java installed?", self.__class__.__name__)
+            self._process = None
+            self._ready.set()
+            return
+
+        output_thread = threading.Thread(target=self._log_subprocess_output, args=(self._process.stdout,))
+        output_thread.daemon = True
+        output_thread.start()
+
+        startup_thread = threading.Thread(target=self._await_server)
+        startup_thread.daemon = True
+        startup_thread.start()
+
+        self._log.debug("Starting server: ({}:{})".format(self.IP, self._port))
+
+    def wait_ready(self, timeout=None):
+        """
+        Block until the server accepts connections.
+
+        Returns
+        -------
+        bool
+            True if the server is ready, False on timeout or if the server process terminated
+        """
+        return self._ready.wait(timeout) and self._available and self._is_running()
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        if self._is_running():
+            self._process.kill()
+
+    def _is_running(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _request(self, line):
+        if not self.wait_ready(self._startup_timeout):
+            raise ConnectionError("{} is not available on port {}".format(self.__class__.__name__, self._port))
+
+        try:
+            with closing(socket.create_connection((self.IP, self._port), timeout=self._request_timeout)) as sock:
+                sock.sendall((line.replace('\n', ' ').strip() + '\n').encode('utf-8'))
+                sock.shutdown(socket.SHUT_WR)
+
+                with sock.makefile('rb') as response:
+                    return response.read().decode('utf-8')
+        except socket.timeout as e:
+            raise TimeoutError("{} on port {} did not respond within {}s".format(
+                self.__class__.__name__, self._port, self._request_timeout)) from e
+
+    def _request_batch(self, lines):
+        return list(self._pool.map(self._request, lines))
+
+    def _await_server(self):
+        """Readiness handshake: the server is ready once it accepts a connection."""
+        deadline = time.time() + self._startup_timeout
+        delay = 0.05
+        while self._process.poll() is None and time.time() < deadline:
+            try:
+                with closing(socket.create_connection((self.IP, self._port), timeout=1)):
+                    self._log.debug("Server ready: ({}:{})".format(self.IP, self._port))
+                    self._available = True
+                    self._ready.set()
+                    return
+            except OSError:
+                time.sleep(delay)
+                delay = min(2 * delay, 1.0)
+
+        self._log.error("Couldn't start Java server %s. Do you have Java installed?", self.__class__.__name__)
+        # Unblock waiting requests, wait_ready reports the failure
+        self._ready.set()
+
+    def _log_subprocess_output(self, pipe):
+        with pipe:
+            for line in iter(pipe.readline, b''):
+                self._log.debug(line.decode().replace('\n', ''))
+
+    @staticmethod
+    def _find_free_port():
+        with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+            s.bind(('', 0))
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            return s.getsockname()[1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -4,18 +4,16 @@ from nltk.metrics.distance import edit_distance
 
 from cltl.triple_extraction.api import UtteranceHypothesis
 from cltl.triple_extraction.nlp.ner import NER
+from cltl.triple_extraction.nlp.shared import SharedInstance
 
 
 # TODO Module is not used
 
 
 class KnownNameParser:
-    TAGGER = None  # type: NER
+    TAGGER = SharedInstance(NER)  # type: NER
 
     def __init__(self, names, max_name_distance=3, min_alternatives=4):
-        if not self.TAGGER:
-            self.TAGGER = NER()
-
         self._names = names
         self._max_name_distance = max_name_distance
         self._min_alternatives = min_alternatives
@@ -24,8 +22,10 @@ class KnownNameParser:
         toi = None  # Transcript of Interest
         words = []
 
-        for i, (hypothesis) in enumerate(hypotheses):
-            for word, tag in self.TAGGER.tag(hypothesis.transcript):
+        # Tag all hypotheses in one batch
+        tagged = self.TAGGER.tag_batch([hypothesis.transcript for hypothesis in hypotheses])
+        for i, (hypothesis, tagged_words) in enumerate(zip(hypotheses, tagged)):
+            for word, tag in tagged_words:
                 if tag in NameParser.TAGS_OF_INTEREST:
                     words.append((word, hypothesis.confidence))
 
@@ -52,12 +52,9 @@ class KnownNameParser:
 class NameParser:
     TAGS_OF_INTEREST = ['PERSON', 'LOCATION', 'ORGANISATION']
 
-    TAGGER = None  # type: NER
+    TAGGER = SharedInstance(NER)  # type: NER
 
     def __init__(self, names, languages=('en-GB', 'nl-NL', 'es-ES'), max_name_distance=2, min_alternatives=4):
-        if not NameParser.TAGGER:
-            NameParser.TAGGER = NER()
-
         self._names = names
         self._languages = languages
         self._asrs = [SynchronousGoogleASR(language) for language in languages]
@@ -70,8 +67,10 @@ class NameParser:
         toi = None  # Transcript of Interest
         words = []
 
-        for i, (hypothesis) in enumerate(hypotheses):
-            for word, tag in self.TAGGER.tag(hypothesis.transcript):
+        # Tag all hypotheses in one batch
+        tagged = self.TAGGER.tag_batch([hypothesis.transcript for hypothesis in hypotheses])
+        for i, (hypothesis, tagged_words) in enumerate(zip(hypotheses, tagged)):
+            for word, tag in tagged_words:
                 if tag in NameParser.TAGS_OF_INTEREST:
                     words.append((word, hypothesis.confidence))
 
@@ -114,7 +113,8 @@ class NameParser:
     def _parse_new(self, asr, audio):
         transcript = asr.transcribe(audio)
 
-        for i, hypothesis in enumerate(transcript):
-            for word, tag in self.TAGGER.tag(hypothesis.transcript):
+        tagged = self.TAGGER.tag_batch([hypothesis.transcript for hypothesis in transcript])
+        for hypothesis, tagged_words in zip(transcript, tagged):
+            for word, tag in tagged_words:
                 if tag in NameParser.TAGS_OF_INTEREST:
                     return word, hypothesis.confidence
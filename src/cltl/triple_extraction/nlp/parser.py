@@ -1,30 +1,66 @@
+from collections import OrderedDict
+
 from cltl.commons.language_helpers import cfg
-from nltk import CFG, RecursiveDescentParser
+from nltk import CFG, Production
 from nltk import pos_tag
+from nltk.grammar import is_nonterminal
+from nltk.parse.earleychart import EarleyChartParser
 
 from cltl.triple_extraction import logger
 from cltl.triple_extraction.nlp.ner import NER
 from cltl.triple_extraction.nlp.pos import POS
+from cltl.triple_extraction.nlp.shared import SharedInstance
 
 
 class Parser(object):
-    POS_TAGGER = None  # Type: POS
-    NER_TAGGER = None
-    GRAMMAR = None
+    # Taggers are started on first use, see warm_up
+    POS_TAGGER = SharedInstance(POS)  # Type: POS
+    NER_TAGGER = SharedInstance(NER)  # Type: NER
+    GRAMMAR = None  # Type: CFG
 
     def __init__(self):
         self._log = logger.getChild(self.__class__.__name__)
 
-        if not Parser.POS_TAGGER:
-            Parser.POS_TAGGER = POS()
-
-        if not Parser.NER_TAGGER:
-            Parser.NER_TAGGER = NER()
-
         if not Parser.GRAMMAR:
-            Parser.GRAMMAR = cfg
+            Parser.GRAMMAR = self._compile_grammar(cfg)
             self._log.debug("Loaded grammar")
         self._cfg = Parser.GRAMMAR
+        self._chart_parser = EarleyChartParser(self._cfg)
+        self._production_order = {production: idx for idx, production in enumerate(self._cfg.productions())}
+
+        self._forest = []
+        self._constituents = {}
+        self._structure_tree = None
+
+    @classmethod
+    def warm_up(cls):
+        """
+        Start the taggers, such that the first call to parse does not pay their startup time.
+        """
+        return cls.POS_TAGGER, cls.NER_TAGGER
+
+    @staticmethod
+    def _compile_grammar(grammar):
+        """
+        Compile the grammar once, adding a rule T -> 'T' for every preterminal T (the POS tags),
+        such that sentences are parsed on their sequence of POS tags instead of their words.
+        """
+        nonterminal_grammar = CFG.fromstring(grammar)
+        productions = nonterminal_grammar.productions()
+
+        defined = {production.lhs() for production in productions}
+        preterminals = OrderedDict.fromkeys(symbol for production in productions for symbol in production.rhs()
+                                            if is_nonterminal(symbol) and symbol not in defined)
+        lexical = [Production(tag, [tag.symbol()]) for tag in preterminals]
+
+        return CFG(nonterminal_grammar.start(), productions + lexical)
+
+    def _derivation_order(self, tree):
+        """
+        Order of the leftmost derivation of the tree in the grammar, i.e. the order in which a top-down parser
+        would find it.
+        """
+        return [self._production_order[production] for production in tree.productions()]
 
     @property
     def forest(self):
@@ -67,30 +103,18 @@ class Parser(object):
             pos[0] = ('Does', 'VBD')
 
         # the POS tagger returns one tag with a $ sign (POS$) and this needs to be fixed for the CFG parsing
-        ind = 0
-        for word, tag in pos:
-            if '?' in word:
-                word = word[:-1]
-            if tag.endswith('$'):
-                new_rule = tag[:-1] + 'POS -> \'' + word + '\'\n'
-                pos[ind] = (pos[ind][0], 'PRPPOS')
-            else:
-                # CFG grammar is created dynamically, with the terminals added each time from the specific utterance
-                new_rule = tag + ' -> \'' + word + '\'\n'
-            if new_rule not in self._cfg:
-                self._cfg += new_rule
-            ind += 1
-
-        try:
-            cfg_parser = CFG.fromstring(self._cfg)
-            rd = RecursiveDescentParser(cfg_parser)
+        tags = [tag[:-1] + 'POS' if tag.endswith('$') else tag for word, tag in pos]
 
-            last_token = tokenized_sentence[len(tokenized_sentence) - 1]
+        words = list(tokenized_sentence)
+        if words and '?' in words[-1]:
+            words[-1] = words[-1][:-1]
 
-            if '?' in last_token:
-                tokenized_sentence[len(tokenized_sentence) - 1] = last_token[:-1]
-
-            parsed = rd.parse(tokenized_sentence)
+        try:
+            # Parse the sequence of POS tags and put the words back in as leaves
+            parsed = sorted(self._chart_parser.parse(tags), key=self._derivation_order)
+            for tree in parsed:
+                for position, word in zip(tree.treepositions('leaves'), words):
+                    tree[position] = word
 
             s_r = {}  # syntactic_realizations are the topmost branches, usually VP/NP
             index = 0
@@ -3,6 +3,46 @@ import os
 from nltk.tag.stanford import StanfordPOSTagger
 
 from cltl.triple_extraction import logger
+from cltl.triple_extraction.nlp.java_server import JavaSocketServer
+
+
+class POSServer(JavaSocketServer):
+    """Stanford MaxentTaggerServer tagging pre-tokenized, whitespace separated sentences"""
+
+    TAG_SEPARATOR = '_'
+
+    def __init__(self, model, path_to_jar, connections=4, java_options='-mx1000m', request_timeout=30):
+        super().__init__(['java', java_options, '-cp', path_to_jar, 'edu.stanford.nlp.tagger.maxent.MaxentTaggerServer',
+                          '-model', model, '-tokenize', 'false', '-encoding', 'utf-8',
+                          '-tagSeparator', POSServer.TAG_SEPARATOR],
+                         connections=connections, request_timeout=request_timeout)
+
+    def tag_sents(self, sentences):
+        """
+        Parameters
+        ----------
+        sentences: List[List[str]]
+            Tokenized sentences
+
+        Returns
+        -------
+        List[List[Tuple[str, str]]]
+            (token, tag) pairs for each sentence
+        """
+        responses = self._request_batch([' '.join(tokens) for tokens in sentences])
+
+        return [self._parse_response(tokens, response) for tokens, response in zip(sentences, responses)]
+
+    def tag(self, tokens):
+        return self.tag_sents([tokens])[0]
+
+    @staticmethod
+    def _parse_response(tokens, response):
+        tagged = [tuple(word.rsplit(POSServer.TAG_SEPARATOR, 1)) for word in response.split()]
+        if len(tagged) != len(tokens) or any(len(pair) != 2 for pair in tagged):
+            raise ValueError("Unexpected response from POS server: " + response)
+
+        return [(token, tag) for token, (_, tag) in zip(tokens, tagged)]
 
 
 class POS(object):
@@ -16,9 +56,18 @@ class POS(object):
     STANFORD_POS_JAR = os.path.join(STANFORD_POS, 'stanford-postagger.jar')
     STANFORD_POS_TAGGER = os.path.join(STANFORD_POS, 'models/english-bidirectional-distsim.tagger')
 
-    def __init__(self):
+    def __init__(self, server=True):
+        """
+        Parameters
+        ----------
+        server: bool
+            Keep a tagging server running (default), otherwise each call to tag starts a new Java process
+        """
         self._log = logger.getChild(self.__class__.__name__)
-        self._tagger = StanfordPOSTagger(POS.STANFORD_POS_TAGGER, path_to_jar=POS.STANFORD_POS_JAR)
+        if server:
+            self._tagger = POSServer(POS.STANFORD_POS_TAGGER, path_to_jar=POS.STANFORD_POS_JAR)
+        else:
+            self._tagger = StanfordPOSTagger(POS.STANFORD_POS_TAGGER, path_to_jar=POS.STANFORD_POS_JAR)
 
         self._log.debug("Booted POS tagger")
 
@@ -34,10 +83,33 @@ class POS(object):
         -------
         POS: list of tuples of strings
         """
+        return self.tag_sents([tokens])[0]
+
+    def tag_sents(self, sentences):
+        """
+        Tag Part of Speech for multiple tokenized sentences in one batch
+
+        Parameters
+        ----------
+        sentences: List[List[str]]
+
+        Returns
+        -------
+        POS: list of lists of tuples of strings
+        """
+        if not any(sentences):
+            return [[] for _ in sentences]
 
         try:
-            return self._tagger.tag(tokens)
+            return self._tagger.tag_sents(sentences)
+        except TimeoutError as e:
+            self._log.error(e)
+            return [[(token, 'ERROR') for token in tokens] for tokens in sentences]
         except Exception as e:
             self._log.error("Couldn't connect to Java POS Server. Do you have Java installed?")
             self._log.error(e)
-            return [(token, 'ERROR') for token in tokens]
+            return [[(token, 'ERROR') for token in tokens] for tokens in sentences]
+
+    def close(self):
+        if isinstance(self._tagger, POSServer):
+            self._tagger.close()
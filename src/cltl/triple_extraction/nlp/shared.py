@@ -0,0 +1,37 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_instances = dict()
+_lock = threading.RLock()
+
+
+def get_shared(factory):
+    """
+    Return the process-wide instance created by the factory, creating it on first use.
+    """
+    instance = _instances.get(factory)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(factory)
+            if instance is None:
+                logger.debug("Create shared %s", getattr(factory, '__name__', factory))
+                instance = factory()
+                _instances[factory] = instance
+
+    return instance
+
+
+class SharedInstance:
+    """
+    Class attribute whose value is created on first access instead of at import time.
+
+    All SharedInstance attributes with the same factory share a single instance per process.
+    Assigning the attribute on an instance overrides it for that instance only.
+    """
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __get__(self, obj, objtype=None):
+        return get_shared(self._factory)
@@ -0,0 +1,51 @@
+"""
+Process-wide registry of spaCy pipelines.
+
+Consumers declare the pipeline components they need, each language model is loaded once per set of
+components with all other components excluded, and the loaded pipeline is shared between consumers.
+"""
+
+import logging
+import threading
+
+import spacy
+
+logger = logging.getLogger(__name__)
+
+# Standard components of the spaCy core pipelines
+STANDARD_COMPONENTS = ('tok2vec', 'tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer',
+                       'ner')
+
+# Component sets used by the analyzers
+TOKENIZER = ()
+TAGGER = ('tok2vec', 'tagger', 'morphologizer', 'attribute_ruler', 'lemmatizer')
+PARSER = TAGGER + ('parser',)
+
+_models = dict()
+_lock = threading.Lock()
+
+
+def load_spacy(name, components=TAGGER):
+    """
+    Load a spaCy pipeline with only the given components, or return the one that is already loaded.
+
+    Parameters
+    ----------
+    name: str
+        Name of the spaCy model package, e.g. en_core_web_sm
+    components: Iterable[str]
+        Pipeline components to keep, all other standard components are excluded
+
+    Returns
+    -------
+    spacy.language.Language
+        The shared pipeline
+    """
+    key = (name, frozenset(components))
+    with _lock:
+        if key not in _models:
+            exclude = [component for component in STANDARD_COMPONENTS if component not in key[1]]
+            logger.info("Loading spaCy model %s with components %s", name, sorted(key[1]))
+            _models[key] = spacy.load(name, exclude=exclude)
+
+        return _models[key]
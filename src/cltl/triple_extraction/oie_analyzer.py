@@ -1,10 +1,15 @@
+import bisect
+import itertools
 import logging
+import threading
+from typing import List
 
 from openie import StanfordOpenIE
 
 from cltl.commons.discrete import UtteranceType
 from cltl.triple_extraction.analyzer import Analyzer
-from cltl.triple_extraction.api import Chat
+from cltl.triple_extraction.api import Chat, Utterance
+from cltl.triple_extraction.triple import Triple, TripleElement
 from cltl.triple_extraction.utils.helper_functions import fix_pronouns
 
 logger = logging.getLogger(__name__)
@@ -14,23 +19,29 @@ class OIEAnalyzer(Analyzer):
     # https://stanfordnlp.github.io/CoreNLP/openie.html#api
     # Default value of openie.affinity_probability_cap was 1/3.
     PROPERTIES = {'openie.affinity_probability_cap': 2 / 3, }
+    # Transcripts in a batch are separated by newlines and never share a sentence
+    BATCH_PROPERTIES = {'ssplit.newlineIsSentenceBreak': 'always'}
 
     def __init__(self):
         """
         OIE Analyzer Object
 
+        The CoreNLP server is started on first use and kept running until close() is called.
+
         Parameters
         ----------
         """
         super().__init__()
         self._utterance = None
+        self._client = None
+        self._client_lock = threading.Lock()
 
     @property
     def utterance(self):
         return self._utterance
 
     def analyze_in_context(self, chat: Chat):
-        self.analyze(chat.last_utterance)
+        self.analyze(chat)
 
     def analyze(self, chat):
         """
@@ -44,26 +55,97 @@ class OIEAnalyzer(Analyzer):
             utterance to be analyzed
 
         """
-        self._utterance = chat.last_utterance
+        self.analyze_batch([chat.last_utterance])
 
-        try:
-            with StanfordOpenIE(properties=OIEAnalyzer.PROPERTIES) as client:
-                text = self._utterance.transcript
-
-                result = client.annotate(text)
-                if result:
-                    logger.info(f'Found {len(result)} triples')
-                    for triple in result:
-                        # Final triple assignment
-                        fixed_triple = {
-                            "subject": {'label': fix_pronouns(triple['subject'], self.utterance.utterance_speaker, self._utterance.chat.speaker, self._utterance.chat.agent),
-                                        'type': []},
-                            "predicate": {'label': triple['relation'], 'type': []},
-                            "object": {'label': fix_pronouns(triple['object'], self.utterance.utterance_speaker, self._utterance.chat.speaker, self._utterance.chat.agent),
-                                       'type': []},
-                        }
-
-                        self.set_extracted_values(utterance_type=UtteranceType.STATEMENT, triple=fixed_triple)
+    def analyze_batch(self, utterances: List[Utterance]):
+        """
+        Extract triples for multiple utterances with a single request to the CoreNLP server
 
+        Parameters
+        ----------
+        utterances: List[Utterance]
+            utterances to be analyzed
+        """
+        try:
+            results = self.annotate_batch([utterance.transcript for utterance in utterances])
         except Exception:
             logger.exception("Couldn't extract triples")
+            return
+
+        for utterance, result in zip(utterances, results):
+            self._utterance = utterance
+            if result:
+                logger.info(f'Found {len(result)} triples')
+            for triple in result:
+                # Final triple assignment
+                fixed_triple = Triple(
+                    subject=TripleElement(fix_pronouns(triple['subject'], utterance.utterance_speaker, utterance.chat.speaker, utterance.chat.agent)),
+                    predicate=TripleElement(triple['relation']),
+                    object=TripleElement(fix_pronouns(triple['object'], utterance.utterance_speaker, utterance.chat.speaker, utterance.chat.agent)),
+                )
+
+                self.set_extracted_values(utterance_type=UtteranceType.STATEMENT, triple=fixed_triple)
+
+    def annotate_batch(self, transcripts: List[str]) -> List[List[dict]]:
+        """
+        Annotate multiple transcripts in a single round trip to the CoreNLP server
+
+        Parameters
+        ----------
+        transcripts: List[str]
+            texts to be annotated
+
+        Returns
+        -------
+        List[List[dict]]
+            For each transcript the OpenIE triples with keys subject, relation and object
+        """
+        lines = [transcript.replace("\n", " ") for transcript in transcripts]
+        # CoreNLP character offsets count UTF-16 code units, i.e. characters outside the BMP (e.g. emoji) count twice
+        starts = list(itertools.accumulate([0] + [len(line.encode('utf-16-le')) // 2 + 1 for line in lines[:-1]]))
+
+        results = [[] for _ in lines]
+        if not any(line.strip() for line in lines):
+            return results
+
+        output = self._annotate("\n".join(lines), properties=OIEAnalyzer.BATCH_PROPERTIES)
+        for sentence in output['sentences']:
+            if not sentence['tokens']:
+                continue
+            idx = bisect.bisect_right(starts, sentence['tokens'][0]['characterOffsetBegin']) - 1
+            results[idx].extend({'subject': triple['subject'], 'relation': triple['relation'], 'object': triple['object']}
+                                for triple in sentence['openie'])
+
+        return results
+
+    def close(self):
+        """
+        Stop the CoreNLP server
+        """
+        with self._client_lock:
+            self._stop_client()
+
+    def _annotate(self, text, properties=None):
+        with self._client_lock:
+            try:
+                return self._get_client().annotate(text, properties=properties, simple_format=False)
+            except Exception:
+                logger.warning("CoreNLP request failed, restarting the OpenIE client", exc_info=True)
+                self._stop_client()
+
+            return self._get_client().annotate(text, properties=properties, simple_format=False)
+
+    def _get_client(self):
+        if self._client is None:
+            logger.info("Starting OpenIE client")
+            self._client = StanfordOpenIE(properties=OIEAnalyzer.PROPERTIES)
+
+        return self._client
+
+    def _stop_client(self):
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.client.stop()
+            except Exception:
+                logger.exception("Failed to stop the CoreNLP server")
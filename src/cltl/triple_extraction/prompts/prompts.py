@@ -78,6 +78,58 @@ triple_extraction_function = [
         }
     }
 ]
+
+
+def triples_schema(function=triple_extraction_function[0]):
+    """
+    JSON schema of the {"triples": [...]} response, with the triple properties of the triple extraction function.
+
+    Integer scores are relaxed to numbers, as certainty and sentiment may be fractional (e.g. a certainty of 0.75).
+    The perspective scores are required, such that constrained decoding can't leave them out. They are accepted
+    either as properties of the triple, as in the extraction function, or nested in a "perspective" object, as in
+    the examples of the STATEMENT and CONVERSATION_LONG prompts.
+    """
+    properties = {name: dict(parameter, type='number' if parameter['type'] == 'integer' else parameter['type'])
+                  for name, parameter in function['parameters']['properties'].items()}
+    elements = ['subject', 'predicate', 'object']
+    scores = [name for name in properties if name not in elements]
+
+    perspective = {
+        'type': 'object',
+        'properties': {name: properties[name] for name in scores},
+        'required': scores
+    }
+    nested_properties = {name: properties[name] for name in elements}
+    nested_properties['perspective'] = perspective
+
+    return {
+        'type': 'object',
+        'properties': {
+            'triples': {
+                'type': 'array',
+                'description': function['description'],
+                'items': {
+                    'anyOf': [
+                        {
+                            'type': 'object',
+                            'properties': properties,
+                            'required': list(properties)
+                        },
+                        {
+                            'type': 'object',
+                            'properties': nested_properties,
+                            'required': elements + ['perspective']
+                        }
+                    ]
+                }
+            }
+        },
+        'required': ['triples']
+    }
+
+
+TRIPLES_SCHEMA = triples_schema()
+
 support_set = [
     [('speaker1', 'what kind of hobbies do you like ?'), ('speaker2', "i'm taking swimming lessons . . . didn't learn as a kid . how about you ?"), ('speaker1', 'i love music . especially prince , i am also bi lingual i speak english and spanish\n')],
 
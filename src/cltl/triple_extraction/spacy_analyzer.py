@@ -1,10 +1,9 @@
 import logging
 
-import spacy
-
 from cltl.commons.discrete import UtteranceType
 from cltl.triple_extraction.analyzer import Analyzer
 from cltl.triple_extraction.api import Chat
+from cltl.triple_extraction.nlp.spacy_models import load_spacy, PARSER
 from cltl.triple_extraction.spacy_triples import dep_to_triple
 
 
@@ -21,7 +20,7 @@ class spacyAnalyzer(Analyzer):
         ----------
         """
         super().__init__()
-        self._nlp = spacy.load("en_core_web_sm")
+        self._nlp = load_spacy("en_core_web_sm", PARSER)
         self._utterance = None
 
     @property
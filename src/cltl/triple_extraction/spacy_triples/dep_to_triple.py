@@ -1,14 +1,15 @@
 
 import spacy
 
+from cltl.triple_extraction.triple import Triple, TripleElement
+
 
 def predicateInfoToTriple(pred_info: dict, predicate: str):
     triple = None
     if pred_info.get('head') and pred_info.get('tail'):
-        triple = {'predicate': {'label': predicate, 'type': []},
-                  'subject': {'label': pred_info.get('head'), 'type': []},
-                  'object': {'label': pred_info.get('tail'), 'type': []}
-                  }
+        triple = Triple(predicate=TripleElement(predicate),
+                        subject=TripleElement(pred_info.get('head')),
+                        object=TripleElement(pred_info.get('tail')))
 
     return triple
 
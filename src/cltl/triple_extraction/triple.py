@@ -0,0 +1,160 @@
+class _Record:
+    """
+    Base class for compact records with dictionary style access to their fields.
+
+    A field is contained in the record if its value is not None. Keys other than the fields of the record
+    are kept as they are in a separate dictionary. Records are compared and hashed by value, they must not be
+    modified while they are used as key.
+    """
+    __slots__ = ('_extra',)
+
+    def __init__(self, *args, **kwargs):
+        values = dict(zip(self.__slots__, args), **kwargs)
+        for field in self.__slots__:
+            setattr(self, field, values.pop(field, None))
+        self._extra = values or None
+
+    @classmethod
+    def from_dict(cls, value):
+        if value is None or isinstance(value, cls):
+            return value
+
+        record = cls(**{key: inner for key, inner in value.items() if key in cls.__slots__})
+        extra = {key: inner for key, inner in value.items() if key not in cls.__slots__}
+        if extra:
+            record._extra = extra
+
+        return record
+
+    def to_dict(self):
+        return {field: self._value_to_dict(self[field]) for field in self}
+
+    @staticmethod
+    def _value_to_dict(value):
+        return value.to_dict() if isinstance(value, _Record) else value
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.__slots__:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key) is not None
+
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        yield from (field for field in self.__slots__ if getattr(self, field) is not None)
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(field, self[field]) for field in self]
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values() \
+            and (self._extra or None) == (other._extra or None)
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, ", ".join("%s=%r" % item for item in self.items()))
+
+
+class TripleElement(_Record):
+    __slots__ = ("label", "type", "uri")
+
+    def __init__(self, label=None, type=None, uri=None):
+        """
+        Subject, predicate or object of a triple
+
+        Parameters
+        ----------
+        label: str
+            Label of the element, e.g. 'piek' or 'be-from'
+        type: list of str
+            Types of the element
+        uri: str
+            Optional URI of the element
+        """
+        super().__init__(label, type if type is not None else [], uri)
+
+    def to_dict(self):
+        # Always include label and type, the uri only if it is set
+        value = {"label": self.label, "type": self.type}
+        value.update(super().to_dict())
+
+        return value
+
+    def _values(self):
+        return self.label, tuple(self.type) if isinstance(self.type, list) else self.type, self.uri
+
+
+class Perspective(_Record):
+    __slots__ = ("certainty", "polarity", "sentiment", "emotion")
+
+    def __init__(self, certainty=None, polarity=None, sentiment=None, emotion=None):
+        """
+        Perspective of the speaker on a triple, unknown values are None
+
+        Parameters
+        ----------
+        certainty: float
+        polarity: float
+        sentiment: float
+        emotion: float
+        """
+        super().__init__(certainty, polarity, sentiment, emotion)
+
+
+class Triple(_Record):
+    __slots__ = ("subject", "predicate", "object", "perspective", "utterance_type")
+
+    def __init__(self, subject=None, predicate=None, object=None, perspective=None, utterance_type=None):
+        """
+        Triple extracted from an utterance
+
+        Parameters
+        ----------
+        subject: TripleElement
+        predicate: TripleElement
+        object: TripleElement
+        perspective: Perspective
+        utterance_type: UtteranceType
+        """
+        super().__init__(subject, predicate, object, perspective, utterance_type)
+
+    def __setattr__(self, key, value):
+        if isinstance(value, dict) and key in self.__slots__:
+            value = Perspective.from_dict(value) if key == "perspective" else TripleElement.from_dict(value)
+
+        super().__setattr__(key, value)
@@ -0,0 +1,83 @@
+"""
+Build the DBpedia label index used by :func:`cltl.triple_extraction.utils.helper_functions.get_uris`.
+
+Usage::
+
+    python -m cltl.triple_extraction.utils.dbpedia_index labels_lang=en.ttl.bz2 resources/dbpedia_labels.idx
+
+The input is a DBpedia labels dump in N-Triples or Turtle line format, optionally compressed with bz2 or gzip.
+"""
+import argparse
+import bz2
+import gzip
+import logging
+import re
+
+from cltl.triple_extraction.utils.sorted_index import build_index
+
+logger = logging.getLogger(__name__)
+
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+
+_LABEL_TRIPLE = re.compile(r'^<([^>]+)>\s+<' + re.escape(RDFS_LABEL) + r'>\s+"((?:[^"\\]|\\.)*)"@([a-zA-Z-]+)\s*\.\s*$')
+_ESCAPE = re.compile(r'\\(u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)')
+_ESCAPED_CHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _unescape(literal):
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in 'uU':
+            return chr(int(escape[1:], 16))
+        return _ESCAPED_CHARS.get(escape, escape)
+
+    return _ESCAPE.sub(replace, literal)
+
+
+def normalize_label(label):
+    """ Key of a label in the index, in the form of the triple elements: lowercase, words joined by dashes.
+
+    E.g. both 'New York' and 'new-york' are normalized to 'new-york'.
+    """
+    return '-'.join(label.lower().split())
+
+
+def parse_labels(lines, language='en'):
+    """ (label, URI) pairs of the rdfs:label triples in the given language.
+
+    :param lines: lines of an N-Triples or Turtle line-based DBpedia dump
+    :param language: language tag of the labels
+    """
+    for line in lines:
+        match = _LABEL_TRIPLE.match(line)
+        if match and match.group(3).lower() == language:
+            yield _unescape(match.group(2)), match.group(1)
+
+
+def _open(path):
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+
+    return open(path, encoding='utf-8')
+
+
+def build_label_index(dump, index_path, language='en'):
+    with _open(dump) as lines:
+        return build_index(index_path, ((normalize_label(label), uri) for label, uri in parse_labels(lines, language)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a label to URI index from a DBpedia labels dump")
+    parser.add_argument("dump", help="DBpedia labels dump (.ttl/.nt, optionally .bz2 or .gz)")
+    parser.add_argument("index", help="Index file to create")
+    parser.add_argument("--language", default="en", help="Language tag of the labels")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    build_label_index(args.dump, args.index, args.language)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
 import json
+import logging
+import os
 import threading
 import urllib.error
 import urllib.parse
@@ -12,10 +14,26 @@ from nltk import pos_tag
 from nltk import tree as ntree
 from nltk.data import find
 
+from cltl.triple_extraction.triple import Triple, TripleElement, Perspective
 from . import wordnet_utils as wu
+from .dbpedia_index import normalize_label
+from .sorted_index import SortedIndex
+
+logger = logging.getLogger(__name__)
 
 thread_local = threading.local()
 
+DBPEDIA_ENDPOINT = "http://dbpedia.org/sparql"
+DBPEDIA_INDEX_ENV = "CLTL_DBPEDIA_INDEX"
+DBPEDIA_ENDPOINT_ENV = "CLTL_DBPEDIA_ENDPOINT"
+
+_uri_lock = threading.Lock()
+_uri_index = None
+_uri_index_path = os.environ.get(DBPEDIA_INDEX_ENV)
+# Offline by default, the live endpoint (e.g. DBPEDIA_ENDPOINT) is only queried if configured
+_uri_endpoint = os.environ.get(DBPEDIA_ENDPOINT_ENV)
+_uri_timeout = 5.0
+
 
 def load_wnl():
     if not hasattr(thread_local, "wnl"):
@@ -148,7 +166,7 @@ def get_triple_element_type_without_pos(element):
             return 'NE-col'
 
         # Try to get types from wordnet
-        lexname = get_lexname_in_tree(text)
+        lexname = get_lexname_in_tree_without_forest(text)
         if lexname:
             # collocations which exist in WordNet
             return lexname + '-col'
@@ -207,7 +225,7 @@ def get_word_type_without_forest(word):
     if word == '':
         return ''
 
-    lexname = get_lexname_in_tree(word)
+    lexname = get_lexname_in_tree_without_forest(word)
     if lexname is not None:
         return lexname
 
@@ -242,10 +260,7 @@ def get_lexname_in_tree(word, forest):
     pos_label = get_pos_tag(forest[0], word)
 
     # Try to get types from wordnet
-    synset = wu.get_synsets(word, pos_label)
-    if synset:
-        type = wu.get_lexname(synset[0])
-        return type
+    return wu.get_first_lexname(word, pos_label)
 
 def get_lexname_in_tree_without_forest(word):
     """
@@ -258,10 +273,7 @@ def get_lexname_in_tree_without_forest(word):
         return None
 
     # Try to get types from wordnet
-    synset = wu.get_synsets(word, 'N')
-    if synset:
-        type = wu.get_lexname(synset[0])
-        return type
+    return wu.get_first_lexname(word, 'N')
 
 def get_pos_in_tree(tree, word):
     """
@@ -295,11 +307,12 @@ def get_pos_tag(forest, word):
     return pos_label
 
 
-def dbp_query(q, base_url, format="application/json"):
+def dbp_query(q, base_url, format="application/json", timeout=None):
     """
     :param q: query for DBpedia
     :param base_url: URL to connect to DBpedia
     :param format: format for query, typically json
+    :param timeout: timeout in seconds for the request
     :return: json with DBpedia responses
     """
     params = {
@@ -313,29 +326,73 @@ def dbp_query(q, base_url, format="application/json"):
         "fname": ""
     }
 
-    querypart = urllib.parse.urlencode(params)
-    response = urllib.request.urlopen(base_url, querypart).read()
+    querypart = urllib.parse.urlencode(params).encode('utf-8')
+    response = urllib.request.urlopen(base_url, querypart, timeout=timeout).read()
     return json.loads(response)
 
 
-def get_uris(string):
+def configure_uris(index_path=None, endpoint=None, timeout=5.0):
     """
-    :param string: string which we are querying for
-    :return: set of URIS from DBpedia for the queried string
+    Configure the backends of get_uris. Without configuration the index is read from the path in the
+    CLTL_DBPEDIA_INDEX environment variable and the endpoint from the CLTL_DBPEDIA_ENDPOINT environment variable,
+    if set. Without either, get_uris stays offline and finds no URIs.
+
+    :param index_path: label index built with cltl.triple_extraction.utils.dbpedia_index, or None
+    :param endpoint: SPARQL endpoint queried for labels that are not in the index, e.g. DBPEDIA_ENDPOINT,
+        or None to stay offline
+    :param timeout: timeout in seconds for queries to the endpoint
     """
+    global _uri_index, _uri_index_path, _uri_endpoint, _uri_timeout
+
+    with _uri_lock:
+        if _uri_index is not None:
+            _uri_index.close()
+        _uri_index = None
+        _uri_index_path = index_path
+        _uri_endpoint = endpoint
+        _uri_timeout = timeout
+
+
+def _get_uri_index():
+    global _uri_index, _uri_index_path
+
+    if _uri_index is None and _uri_index_path:
+        with _uri_lock:
+            if _uri_index is None and _uri_index_path:
+                try:
+                    _uri_index = SortedIndex(_uri_index_path)
+                except (OSError, ValueError):
+                    logger.exception("Failed to open DBpedia label index %s", _uri_index_path)
+                    _uri_index_path = None
+
+    return _uri_index
+
+
+def _query_uris(string, endpoint, timeout):
     query = """PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
                 SELECT ?pred WHERE {
-                  ?pred rdfs:label """ + "'" + string + "'" + """@en .
+                  ?pred rdfs:label """ + json.dumps(string) + """@en .
                 }
                 ORDER BY ?pred"""
 
     try:
-        results = dbp_query(query, "http://dbpedia.org/sparql")
-        uris = []
-        for x in results['results']['bindings']:
-            uris.append(x['pred']['value'])
-    except:
-        uris = []
+        results = dbp_query(query, endpoint, timeout=timeout)
+        return [x['pred']['value'] for x in results['results']['bindings']]
+    except Exception as e:
+        logger.debug("Failed to query %s for %s: %s", endpoint, string, e)
+        return []
+
+
+def get_uris(string):
+    """
+    :param string: string which we are querying for
+    :return: set of URIS from DBpedia for the queried string
+    """
+    index = _get_uri_index()
+    uris = index.get(normalize_label(string)) if index is not None else []
+
+    if not uris and _uri_endpoint:
+        uris = _query_uris(string, _uri_endpoint, _uri_timeout)
 
     return uris
 
@@ -349,6 +406,7 @@ def utterance_to_capsules(utterance):
     capsules = []
 
     for triple in utterance.triples:
+        triple = triple.to_dict() if isinstance(triple, Triple) else triple
         capsule = {"chat": utterance.chat.id,
                    "turn": utterance.turn,
                    "author": utterance.chat_speaker,
@@ -359,7 +417,7 @@ def utterance_to_capsules(utterance):
                    "subject": triple['subject'],
                    "predicate": triple['predicate'],
                    "object": triple['object'],
-                   "perspective": triple["perspective"],
+                   "perspective": triple.get("perspective"),
                    ###
                    "context_id": None,
                    "date": utterance.datetime.isoformat(),
@@ -384,6 +442,8 @@ def element_to_json(v):
         v = v.isoformat()
     elif isinstance(v, UtteranceType):
         v = v.name
+    elif isinstance(v, (Triple, TripleElement, Perspective)):
+        v = element_to_json(v.to_dict())
     elif isinstance(v, list):
         v = [element_to_json(el) for el in v]
     elif isinstance(v, dict):
@@ -398,39 +458,45 @@ def triple_to_json(triple):
     return {k: element_to_json(v) for k, v in triple.items()}
 
 
-def deduplicate_triples(triples):
-    # TODO make more efficient
-    sorted_triples = []
-    for triple in triples:
-        sorted_triple = dict(sorted(triple.items()))
-        sorted_triples.append(sorted_triple)
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, list):
+        return tuple(_freeze(el) for el in value)
+
+    return value
 
-    json_triples = []
-    for triple in sorted_triples:
-        triple_as_json = json.dumps(triple_to_json(triple))
-        json_triples.append(triple_as_json)
 
+def triple_key(triple):
+    """Canonical hashable key of a triple, consisting of the labels of its elements and its perspective"""
+    labels = tuple(triple[el].get('label') if isinstance(triple.get(el), (dict, TripleElement)) else triple.get(el)
+                   for el in ['subject', 'predicate', 'object'])
+
+    return labels + (_freeze(element_to_json(triple.get('perspective'))),)
+
+
+def deduplicate_triples(triples):
+    """Triples without duplicates, in order of their first occurrence"""
+    keys = set()
     unique_triples = []
-    for triple in set(json_triples):
-        unique_triples.append(json.loads(triple))
+    for triple in triples:
+        keys, addition = add_deduplicated(triple, keys)
+        if addition:
+            unique_triples.append(triple_to_json(triple))
 
     return unique_triples
 
 
-def add_deduplicated(triple, list_json_triples):
-    """Adds a triple to a list, only if it is not there. Return list and bool indicating whether an addition was made"""
-    addition = False
-
-    sorted_triple = dict(sorted(triple.items()))
-    triple_as_json = json.dumps(triple_to_json(triple))
+def add_deduplicated(triple, triple_keys):
+    """Adds the key of a triple to a set, only if it is not there.
+    Return set and bool indicating whether an addition was made"""
+    key = triple_key(triple)
+    if key in triple_keys:
+        return triple_keys, False
 
-    if triple_as_json in list_json_triples:
-        pass
-    else:
-        list_json_triples.append(json.loads(triple_as_json))
-        addition = True
+    triple_keys.add(key)
 
-    return list_json_triples, addition
+    return triple_keys, True
 
 
 def get_simple_triple(triple):
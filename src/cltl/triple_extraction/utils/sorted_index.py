@@ -0,0 +1,124 @@
+import logging
+import mmap
+import os
+import struct
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'CLTLIDX1'
+_HEADER = struct.Struct('<8sQ')
+_OFFSET = struct.Struct('<Q')
+_SEPARATOR = b'\t'
+
+
+def _clean(text):
+    return ' '.join(text.split('\t')).replace('\n', ' ')
+
+
+def build_index(path, items):
+    """ Write a sorted string index for (key, value) pairs.
+
+    The file consists of a header with the number of keys, a table with the offsets of the records and the
+    records themselves, sorted by their UTF-8 encoded key. Each record contains the key followed by the
+    sorted, distinct values of that key, separated by tabs.
+
+    :param path: file to write the index to
+    :param items: iterable of (key, value) pairs, keys may occur multiple times
+    :return: number of distinct keys in the index
+    """
+    entries = defaultdict(set)
+    for key, value in items:
+        entries[_clean(key).encode('utf-8')].add(_clean(value).encode('utf-8'))
+
+    keys = sorted(entries)
+    records = [_SEPARATOR.join([key] + sorted(entries[key])) for key in keys]
+
+    offsets = []
+    position = _HEADER.size + (len(records) + 1) * _OFFSET.size
+    for record in records:
+        offsets.append(position)
+        position += len(record)
+    offsets.append(position)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, len(records)))
+        file.write(struct.pack('<%dQ' % len(offsets), *offsets))
+        for record in records:
+            file.write(record)
+    os.replace(tmp_path, path)
+
+    logger.info("Built index %s with %s keys", path, len(records))
+
+    return len(records)
+
+
+class SortedIndex:
+    def __init__(self, path):
+        """ Read-only, memory-mapped index written by :func:`build_index`.
+
+        Lookups are a binary search over the record offsets and only touch the pages of the
+        records compared, the index is therefore not loaded into memory. Lookups don't
+        modify any state and can be done concurrently without locking.
+
+        :param path: index file
+        """
+        self._path = path
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._size = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            self._data.close()
+            raise ValueError(f"{path} is not a sorted index")
+
+        logger.debug("Opened index %s with %s keys", path, self._size)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return self._find(key.encode('utf-8')) is not None
+
+    def get(self, key, default=()):
+        """ Values stored for the key.
+
+        :param key: key to look up
+        :param default: returned if the key is not in the index
+        :return: list of values of the key in sorted order
+        """
+        record = self._find(key.encode('utf-8'))
+        if record is None:
+            return list(default)
+
+        return [value.decode('utf-8') for value in record.split(_SEPARATOR)[1:]]
+
+    def close(self):
+        self._data.close()
+
+    def _record(self, idx):
+        start, end = struct.unpack_from('<2Q', self._data, _HEADER.size + idx * _OFFSET.size)
+
+        return self._data[start:end]
+
+    def _find(self, key):
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            record = self._record(mid)
+            record_key = record.split(_SEPARATOR, 1)[0]
+            if record_key < key:
+                low = mid + 1
+            elif record_key > key:
+                high = mid
+            else:
+                return record
+
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
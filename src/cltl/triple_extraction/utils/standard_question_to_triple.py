@@ -1,7 +1,12 @@
 
 
+import logging
+
+from cltl.triple_extraction.triple import Triple, TripleElement
 from cltl.triple_extraction.utils.helper_functions import extract_perspective
 
+logger = logging.getLogger(__name__)
+
 def standard_questions(utterance, human, agent):
 
     # https://github.com/leolani/cltl-knowledgerepresentation/blob/b96b7017a4420d8e59db2534321f8bd4c93fce76/src/cltl/brain/utils/base_cases.py#L1510
@@ -19,11 +24,10 @@ def standard_questions(utterance, human, agent):
                 who = human
             elif who.lower() == "you":
                 who = agent
-            triple = {"subject": {"label": who.lower(), "type": [], "uri": None},
-                      "predicate": {"label": "have", "type": [], "uri": None},
-                      "object": {"label": "", "type": ["n2mu"], "uri": None},
-                      "perspective": extract_perspective()
-                      }
+            triple = Triple(subject=TripleElement(who.lower()),
+                            predicate=TripleElement("have"),
+                            object=TripleElement("", ["n2mu"]),
+                            perspective=extract_perspective())
             triples.append(triple)
         elif utterance.transcript.lower().startswith("who "):
             tokens = utterance.transcript.split()
@@ -42,21 +46,19 @@ def standard_questions(utterance, human, agent):
                     what = human
                 elif what.lower() == "you":
                     what = agent
-                triple = {"subject": {"label": "", "type": [], "uri": None},
-                          "predicate": {"label": predicate, "type": [], "uri": None},
-                          "object": {"label": what.lower(), "type": ["n2mu"], "uri": None},
-                          "perspective": extract_perspective()
-                          }
+                triple = Triple(subject=TripleElement(""),
+                                predicate=TripleElement(predicate),
+                                object=TripleElement(what.lower(), ["n2mu"]),
+                                perspective=extract_perspective())
                 triples.append(triple)
     elif utterance.transcript.lower().startswith("who does ") and (utterance.transcript.lower().endswith(" know")
                                                                    or utterance.transcript.lower().endswith(" know?")):
         tokens = utterance.transcript.split()
         who = tokens[2]
-        triple = {"subject": {"label": who.lower(), "type": [], "uri": None},
-                  "predicate": {"label": "know", "type": [], "uri": None},
-                  "object": {"label": "", "type": ["person"], "uri": None},
-                  "perspective": extract_perspective()
-                  }
+        triple = Triple(subject=TripleElement(who.lower()),
+                        predicate=TripleElement("know"),
+                        object=TripleElement("", ["person"]),
+                        perspective=extract_perspective())
         triples.append(triple)
     elif (utterance.transcript.lower().startswith("who is ") or
           utterance.transcript.lower().startswith("who are ") or
@@ -82,12 +84,11 @@ def standard_questions(utterance, human, agent):
             who = human
         elif who.lower() == "you":
             who = agent
-        triple = {"subject": {"label": who.lower(), "type": [], "uri": None},
-                  "predicate": {"label": "know", "type": [], "uri": None},
-                  "object": {"label": "", "type": ["person"], "uri": None},
-                  "perspective": extract_perspective()
-                  }
-        print('TRIPLE IS', triple)
+        triple = Triple(subject=TripleElement(who.lower()),
+                        predicate=TripleElement("know"),
+                        object=TripleElement("", ["person"]),
+                        perspective=extract_perspective())
+        logger.debug('TRIPLE IS %s', triple)
         triples.append(triple)
     elif utterance.transcript.lower().startswith("what are ") or \
             utterance.transcript.lower().startswith("what is ") or \
@@ -101,11 +102,10 @@ def standard_questions(utterance, human, agent):
             who = human
         elif who.lower() == "you":
             who = agent
-        triple = {"subject": {"label": who.lower(), "type": [], "uri": None},
-                  "predicate": {"label": "", "type": [], "uri": "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"},
-                  "object": {"label": "", "type": [], "uri": None},
-                  "perspective":extract_perspective()
-                  }
+        triple = Triple(subject=TripleElement(who.lower()),
+                        predicate=TripleElement("", uri="http://www.w3.org/1999/02/22-rdf-syntax-ns#type"),
+                        object=TripleElement(""),
+                        perspective=extract_perspective())
         triples.append(triple)
     elif utterance.transcript.lower().startswith("where are ") or \
             utterance.transcript.lower().startswith("where is "):
@@ -117,11 +117,10 @@ def standard_questions(utterance, human, agent):
             who = human
         elif who.lower() == "you":
             who = agent
-        triple = {"subject": {"label": who.lower(), "type": [], "uri": None},
-                  "predicate": {"label": "", "type": [], "uri": None},
-                  "object": {"label": "", "type": ["n2mu:place"], "uri": None},
-                  "perspective": extract_perspective()
-                  }
+        triple = Triple(subject=TripleElement(who.lower()),
+                        predicate=TripleElement(""),
+                        object=TripleElement("", ["n2mu:place"]),
+                        perspective=extract_perspective())
         triples.append(triple)
     return triples
 
@@ -143,16 +142,14 @@ def ask_for_all(utterance, human, agent):
             who = agent
         elif who.lower().startswith("your"):
             who = agent
-        triple = {"subject": {"label": who.lower(), "type": [], "uri": None},
-                  "predicate": {"label": "", "type": [], "uri": None},
-                  "object": {"label": "", "type": [], "uri": None},
-                  "perspective": extract_perspective()
-                  }
+        triple = Triple(subject=TripleElement(who.lower()),
+                        predicate=TripleElement(""),
+                        object=TripleElement(""),
+                        perspective=extract_perspective())
         triples.append(triple)
-        triple = {"subject": {"label": "", "type": [], "uri": None},
-                  "predicate": {"label": "", "type": [], "uri": None},
-                  "object": {"label": who.lower(), "type": [], "uri": None},
-                  "perspective": extract_perspective()
-                  }
+        triple = Triple(subject=TripleElement(""),
+                        predicate=TripleElement(""),
+                        object=TripleElement(who.lower()),
+                        perspective=extract_perspective())
         triples.append(triple)
     return triples
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Opt-in structured trace of the extraction, e.g. of every triple that is added to an utterance.
+
+Trace events are passed as dictionaries to a sink and are only serialized by the sink, such that tracing
+costs nothing if no sink is configured. Configure a sink with :func:`configure_trace`, or set the
+CLTL_TRACE_FILE environment variable to write the events as JSON lines to a file.
+"""
+import enum
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE_ENV = "CLTL_TRACE_FILE"
+
+
+class JsonLinesSink:
+    def __init__(self, path):
+        """ Append trace events as JSON lines to a file.
+
+        :param path: trace file, created if it doesn't exist
+        """
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(_to_json(event), default=str, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _to_json(value):
+    if hasattr(value, 'to_dict'):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {key: _to_json(inner) for key, inner in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(inner) for inner in value]
+    # Explicitly, as json serializes integer enums as numbers
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, date):
+        return value.isoformat()
+
+    return value
+
+
+_sink = JsonLinesSink(os.environ[TRACE_FILE_ENV]) if os.environ.get(TRACE_FILE_ENV) else None
+
+
+def configure_trace(sink=None):
+    """ Set the sink for trace events.
+
+    :param sink: callable that accepts a trace event dictionary, e.g. a JsonLinesSink, or None to disable tracing
+    """
+    global _sink
+    _sink = sink
+
+
+def trace_enabled():
+    return _sink is not None
+
+
+def trace(event, **fields):
+    """ Pass a trace event to the configured sink, if any.
+
+    :param event: name of the event
+    :param fields: content of the event, serialized by the sink
+    """
+    sink = _sink
+    if sink is None:
+        return
+
+    try:
+        sink(dict(event=event, time=time.time(), **fields))
+    except Exception:
+        logger.exception("Failed to trace %s", event)
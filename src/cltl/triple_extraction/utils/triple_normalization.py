@@ -6,7 +6,10 @@ from cltl.commons.triple_helpers import continuous_to_enum
 from cltl.commons.discrete import UtteranceType
 from cltl.commons.language_helpers import lexicon_lookup, lexicon, lexicon_lookup_subword, lexicon_lookup_subword_class
 from cltl.commons.triple_helpers import fix_nlp_types
-from cltl.triple_extraction.utils.helper_functions import get_triple_element_type, lemmatize, trim_dash, fix_pronouns
+from cltl.triple_extraction.triple import Triple, TripleElement
+from cltl.triple_extraction.utils.helper_functions import get_triple_element_type, lemmatize, trim_dash, fix_pronouns, \
+    element_to_json
+from cltl.triple_extraction.utils.trace import trace
 
 logger = logging.getLogger(__name__)
 
@@ -187,6 +190,7 @@ class TripleNormalizer():
 
     def set_extracted_values(self, utterance_type=None, triple=None, perspective={}):
         # Pack everything together
+        triple = Triple.from_dict(triple)
         triple["perspective"] = perspective
         triple["utterance_type"] = utterance_type
 
@@ -196,13 +200,17 @@ class TripleNormalizer():
         if not triple_is_new:
             return
 
+        trace("triple", analyzer=self.__class__.__name__, turn=self.utterance.turn, triple=triple)
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         if utterance_type:
             self._log_info("Utterance type: {}".format(json.dumps(utterance_type.name,
                                                                   sort_keys=True, separators=(', ', ': '))))
 
         if triple:
             for el in ["subject", "predicate", "object"]:
-                self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(triple[el],
+                self._log_info("RDF triplet {:>10}: {}".format(el, json.dumps(element_to_json(triple[el]),
                                                                               sort_keys=True, separators=(', ', ': '))))
         if triple["perspective"]:
             for el in ['certainty', 'polarity', 'sentiment', 'emotion']:
@@ -306,17 +314,17 @@ class TripleNormalizer():
         """
         This function gets types for all the elements of the triple
         :param triple: S,P,C triple
-        :return: triple dictionary with types
+        :return: Triple with types
         """
         # Get type
         for el in triple:
-            if type(triple[el])==dict:
+            if isinstance(triple[el], (dict, TripleElement)):
                 continue
             if el=="perspective":
                 continue
             text = triple[el]
             final_type = []
-            triple[el] = {'label': text, 'type': []}
+            triple[el] = TripleElement(text, [])
 
             # If no text was extracted we cannot get a type
             if text == '':
@@ -376,7 +384,7 @@ class TripleNormalizer():
                 elif 'proximity' in entry:
                     triple[el]['type'] = ['deictic']
 
-        return triple
+        return Triple.from_dict(triple)
 
 
     def get_kinship(self, triple, utterance_info):
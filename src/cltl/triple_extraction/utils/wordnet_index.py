@@ -0,0 +1,49 @@
+"""
+Build the (word, POS) to lexname table used by :func:`cltl.triple_extraction.utils.wordnet_utils.get_first_lexname`
+from the installed NLTK WordNet.
+
+Usage::
+
+    python -m cltl.triple_extraction.utils.wordnet_index resources/wordnet_lexnames.idx
+"""
+import argparse
+import logging
+
+from cltl.triple_extraction.utils import wordnet_utils as wu
+from cltl.triple_extraction.utils.sorted_index import build_index
+
+logger = logging.getLogger(__name__)
+
+# Penn Treebank tag for each WordNet POS, such that the table is built with the same lookup as get_synsets
+POS_TAGS = {'n': 'NN', 'v': 'VB', 'a': 'JJ', 'r': 'RB'}
+
+
+def lexname_entries():
+    """ (key, lexname) pairs for all lemmas and irregular word forms in WordNet. """
+    exceptions = getattr(wu.wn, '_exception_map', {})
+    for pos, tag in POS_TAGS.items():
+        words = set(wu.wn.all_lemma_names(pos)) | set(exceptions.get(pos, ()))
+        logger.info("Add %s words for POS %s", len(words), pos)
+        for word in words:
+            lexname = wu.get_first_lexname(word, tag)
+            if lexname:
+                yield wu.lexname_key(word.lower(), pos), lexname
+
+
+def build_lexname_index(index_path):
+    wu.configure_lexnames(None)
+
+    return build_index(index_path, lexname_entries())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a (word, POS) to lexname table from the NLTK WordNet")
+    parser.add_argument("index", help="Index file to create")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    build_lexname_index(args.index)
+
+
+if __name__ == '__main__':
+    main()
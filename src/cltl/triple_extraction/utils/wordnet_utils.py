@@ -5,27 +5,46 @@ Created on Fri Mar 22 09:37:31 2019
 
 @author: andrasaponyi
 """
+import logging
+import os
 import threading
 
 from nltk.corpus import wordnet as wn
+from nltk.corpus.reader.wordnet import WordNetCorpusReader
+
+from .sorted_index import SortedIndex
+
+logger = logging.getLogger(__name__)
 
 wn.ensure_loaded()
 wordnet_lock = threading.Lock()
 
+LEXNAME_INDEX_ENV = "CLTL_WORDNET_INDEX"
+
+_lexname_lock = threading.Lock()
+_lexname_index = None
+_lexname_index_path = os.environ.get(LEXNAME_INDEX_ENV)
+
+
+def wordnet_pos(tag):
+    """ Map a Penn Treebank POS tag to the WordNet POS used for synset lookup. """
+    if tag.startswith('N'):
+        return "n"
+    elif tag.startswith('V'):
+        return "v"
+    elif "J" in tag:
+        return "a"
+    elif "RB" in tag:
+        return "r"
+    else:
+        return None
+
+
 # Synset types: n, v, a, r (adverb), s (adjective satellite).
 def get_synsets(word, tag):
     """ Look up and return all possible synset of an input word. """
     with wordnet_lock:
-        if tag.startswith('N'):
-            POS = "n"
-        elif tag.startswith('V'):
-            POS = "v"
-        elif "J" in tag:
-            POS = "a"
-        elif "RB" in tag:
-            POS = "r"
-        else:
-            POS = None
+        POS = wordnet_pos(tag)
 
         synsets = []
         s_sets = wn.synsets(word)
@@ -38,6 +57,66 @@ def get_synsets(word, tag):
         return synsets
 
 
+def configure_lexnames(index_path=None):
+    """ Use a lexname table built with cltl.triple_extraction.utils.wordnet_index for get_first_lexname.
+
+    Without configuration the table is read from the path in the CLTL_WORDNET_INDEX environment variable, if set,
+    otherwise WordNet is queried directly.
+    """
+    global _lexname_index, _lexname_index_path
+
+    with _lexname_lock:
+        if _lexname_index is not None:
+            _lexname_index.close()
+        _lexname_index = None
+        _lexname_index_path = index_path
+
+
+def _get_lexname_index():
+    global _lexname_index, _lexname_index_path
+
+    if _lexname_index is None and _lexname_index_path:
+        with _lexname_lock:
+            if _lexname_index is None and _lexname_index_path:
+                try:
+                    _lexname_index = SortedIndex(_lexname_index_path)
+                except (OSError, ValueError):
+                    logger.exception("Failed to open lexname table %s", _lexname_index_path)
+                    _lexname_index_path = None
+
+    return _lexname_index
+
+
+def lexname_key(word, pos):
+    return word + "/" + pos
+
+
+def get_first_lexname(word, tag):
+    """ Look up the lexname of the first synset of a word, i.e. the lexname of get_synsets(word, tag)[0].
+
+    If a lexname table is configured the lookup doesn't acquire the WordNet lock. Inflected forms that are not in
+    the table are resolved with the morphological rules of WordNet.
+    """
+    index = _get_lexname_index()
+    if index is None:
+        synsets = get_synsets(word, tag)
+        return get_lexname(synsets[0]) if synsets else None
+
+    pos = wordnet_pos(tag)
+    if pos is None:
+        return None
+
+    word = word.lower()
+    forms = [word] + [word[:-len(old)] + new for old, new in WordNetCorpusReader.MORPHOLOGICAL_SUBSTITUTIONS[pos]
+                      if word.endswith(old)]
+    for form in forms:
+        lexname = index.get(lexname_key(form, pos))
+        if lexname:
+            return lexname[0]
+
+    return None
+
+
 # Get a collection of synonymous words.
 def get_lemmas(synset):
     """ Look up and return all lemmas of a given synset. """
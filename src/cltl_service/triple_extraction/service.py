@@ -1,4 +1,5 @@
 import logging
+import os
 from typing import List
 
 from cltl.combot.event.emissor import ScenarioStarted, ScenarioStopped, ScenarioEvent, Agent, ConversationalAgent
@@ -13,6 +14,7 @@ from cltl_service.emissordata.client import EmissorDataClient
 
 from cltl.triple_extraction.analyzer import Analyzer
 from cltl.triple_extraction.api import Chat, DialogueAct
+from cltl.triple_extraction.triple import Triple
 
 logger = logging.getLogger(__name__)
 
@@ -95,15 +97,19 @@ class TripleExtractionService(GroupProcessor):
         topic_intention = config.get("topic_intention") if "topic_intention" in config else None
         intentions = config.get("intentions", multi=True) if "intentions" in config else []
         topic_scenario = config.get("topic_scenario") if "topic_scenario" in config else None
+        max_utterances = config.get_int("max_utterances") if "max_utterances" in config else None
+        chat_log_dir = config.get("chat_log_dir") if "chat_log_dir" in config else None
 
         return cls(topic_input, agent_topic, dialogue_act_topic, topic_output,
                    topic_scenario, topic_intention, intentions,
-                   extractor, emissor_client, event_bus, resource_manager)
+                   extractor, emissor_client, event_bus, resource_manager,
+                   max_utterances=max_utterances, chat_log_dir=chat_log_dir)
 
     def __init__(self, input_topic: str, agent_topic: str, dialogue_act_topic: str, output_topic: str,
                  scenario_topic: str,
                  intention_topic: str, intentions: List[str], extractor: Analyzer,
-                 emissor_client: EmissorDataClient, event_bus: EventBus, resource_manager: ResourceManager):
+                 emissor_client: EmissorDataClient, event_bus: EventBus, resource_manager: ResourceManager,
+                 max_utterances: int = None, chat_log_dir: str = None):
         self._extractor = extractor
 
         self._event_bus = event_bus
@@ -122,6 +128,11 @@ class TripleExtractionService(GroupProcessor):
         self._topic_worker = None
         self._emissor_client = emissor_client
         self._chat = None
+        # Bounded chat history, older utterances are optionally appended to a log file per scenario
+        self._max_utterances = max_utterances
+        self._chat_log_dir = chat_log_dir
+        if chat_log_dir:
+            os.makedirs(chat_log_dir, exist_ok=True)
         self._speaker = Agent()
         self._agent = Agent()
 
@@ -151,6 +162,9 @@ class TripleExtractionService(GroupProcessor):
         self._topic_worker.stop()
         self._topic_worker.await_stop()
         self._topic_worker = None
+        if self._chat:
+            self._chat.close()
+            self._chat = None
 
     def _process(self, event: Event):
         if event.metadata.topic == self._intention_topic:
@@ -182,7 +196,8 @@ class TripleExtractionService(GroupProcessor):
                        for annotation in mention.annotations
                        if annotation.type == ConversationalAgent.__name__)
 
-        self._chat.add_utterance(text_signal.text, self._chat.agent if is_agent else self._chat.speaker, dialogue_acts)
+        self._chat.add_utterance(text_signal.text, self._chat.agent if is_agent else self._chat.speaker, dialogue_acts,
+                                 tokenize=not is_agent)
 
         if is_agent:
             # Add robot utterances to the chat without triple extraction
@@ -307,10 +322,15 @@ class TripleExtractionService(GroupProcessor):
         if event.payload.type == ScenarioStarted.__name__:
             agent_name = self._agent.name if self._agent.name else "Leolani"
             speaker_name = self._speaker.name if self._speaker and self._speaker.name else "Stranger"
-            self._chat = Chat(agent_name, speaker_name)
+            spill_path = os.path.join(self._chat_log_dir, f"chat_{event.payload.scenario.id}.jsonl") \
+                if self._chat_log_dir else None
+            if self._chat:
+                self._chat.close()
+            self._chat = Chat(agent_name, speaker_name, max_utterances=self._max_utterances, spill_path=spill_path)
             logger.debug("Started chat with speaker %s, agent %s", self._chat.speaker, self._chat.agent)
         elif event.payload.type == ScenarioStopped.__name__:
             logger.debug("Stopping chat with %s, agent %s", self._chat.speaker, self._chat.agent)
+            self._chat.close()
             self._chat = None
             self._speaker = None
             self._agent = None
@@ -329,6 +349,7 @@ class TripleExtractionService(GroupProcessor):
             logger.debug("Triple input: %s", triple)
             self._add_uri_to_triple(triple)
             logger.debug("Triple input after adding URI: %s", triple)
+            triple = triple.to_dict() if isinstance(triple, Triple) else triple
             scenario_id = signal.time.container_id
 
             capsule = {"chat": scenario_id,
@@ -0,0 +1,50 @@
+import asyncio
+import concurrent.futures
+import threading
+import unittest
+
+from cltl.triple_extraction.api import Chat
+from cltl.triple_extraction.chat_analyzer import ChatAnalyzer
+from cltl.triple_extraction.conversational_llm_analyzer import AsyncLLMAnalyzer, LLAMA_MODEL
+
+
+class TestAsyncLLMAnalyzer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.chat = Chat("Leolani", "Piek")
+        self.started = threading.Event()
+        self.cancelled = []
+
+        self.analyzer = AsyncLLMAnalyzer(LLAMA_MODEL, timeout=10)
+        self.analyzer._context_prompt = lambda chat: chat.last_utterance.transcript
+        self.analyzer._aextract_triples = self._extract_triples
+
+    def tearDown(self) -> None:
+        self.analyzer.close()
+
+    async def _extract_triples(self, prompt, on_triple):
+        try:
+            if prompt == "I like pizza.":
+                self.started.set()
+                await asyncio.sleep(10)
+
+            return on_triple({"subject": "I", "predicate": "like", "object": "pasta"})
+        except asyncio.CancelledError:
+            self.cancelled.append(prompt)
+            raise
+
+    def test_supersede_through_chat_analyzer(self):
+        self.chat.add_utterance("I like pizza.")
+        pending = self.analyzer.submit(self.analyzer.aanalyze_in_context(self.chat))
+        self.assertTrue(self.started.wait(5))
+
+        self.chat.add_utterance("I like pasta.")
+        chat_analyzer = ChatAnalyzer([self.analyzer], 5)
+        chat_analyzer.analyze_in_context(self.chat)
+        chat_analyzer.close()
+
+        concurrent.futures.wait([pending], timeout=5)
+        self.assertTrue(pending.cancelled())
+        self.assertEqual(["I like pizza."], self.cancelled)
+        self.assertEqual(0, len(self.chat.utterances[0].triples))
+        self.assertEqual(1, len(self.chat.last_utterance.triples))
+        self.assertEqual("pasta", self.chat.last_utterance.triples[0]['object']['label'])
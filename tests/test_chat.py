@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+
+from cltl.triple_extraction.api import Chat
+
+
+class TestChat(unittest.TestCase):
+    def setUp(self) -> None:
+        self.chat = Chat("Leolani", "Piek")
+
+    def test_speaker_turns_group_consecutive_utterances(self):
+        self.chat.add_utterance("Hi.", "Piek")
+        self.chat.add_utterance("I like pizza.", "Piek")
+        self.chat.add_utterance("Do you also like pasta?", "Leolani")
+
+        self.assertEqual([("Piek", "Hi. I like pizza."), ("Leolani", "Do you also like pasta?")],
+                         self.chat.speaker_turns)
+
+    def test_speaker_turns_are_bounded(self):
+        for turn in range(10):
+            self.chat.add_utterance(f"Utterance {turn}", "Piek" if turn % 2 else "Leolani")
+
+        self.assertEqual(10, len(self.chat.utterances))
+        self.assertEqual([("Piek", "Utterance 7"), ("Leolani", "Utterance 8"), ("Piek", "Utterance 9")],
+                         self.chat.speaker_turns)
+
+    def test_add_triple_deduplicates(self):
+        utterance = self.chat.add_utterance("I like pizza.", "Piek")
+
+        def triple(label):
+            return {"subject": {"label": "piek", "type": ["person"]},
+                    "predicate": {"label": "like", "type": ["verb"]},
+                    "object": {"label": label, "type": ["food"]},
+                    "perspective": {"polarity": 1, "certainty": 1, "sentiment": 1}}
+
+        self.assertTrue(utterance.add_triple(triple("pizza")))
+        self.assertFalse(utterance.add_triple(triple("pizza")))
+        self.assertTrue(utterance.add_triple(triple("pasta")))
+        self.assertEqual(["pizza", "pasta"], [t["object"]["label"] for t in utterance.triples])
+
+    def test_utterances_are_bounded(self):
+        chat = Chat("Leolani", "Piek", max_utterances=3)
+        for turn in range(10):
+            chat.add_utterance(f"Utterance {turn}", "Piek")
+
+        self.assertEqual(10, chat.turns)
+        self.assertEqual([7, 8, 9], [utterance.turn for utterance in chat.utterances])
+        self.assertEqual("Utterance 9", chat.last_utterance.transcript)
+
+    def test_evicted_utterances_are_spilled(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spill_path = os.path.join(tmp_dir, "chat.jsonl")
+            with Chat("Leolani", "Piek", max_utterances=2, spill_path=spill_path) as chat:
+                for turn in range(5):
+                    chat.add_utterance(f"Utterance {turn}", "Piek")
+
+            with open(spill_path) as spill_file:
+                spilled = [json.loads(line) for line in spill_file]
+
+        self.assertEqual([0, 1, 2], [utterance["turn"] for utterance in spilled])
+        self.assertEqual("Utterance 0", spilled[0]["transcript"])
+
+    def test_tokens(self):
+        utterance = self.chat.add_utterance("I'm sure Piek's car doesn't run.", "Piek")
+        agent_utterance = self.chat.add_utterance("That's nice!", "Leolani", tokenize=False)
+
+        self.assertEqual(["I", "am", "sure", "Piek", "car", "does", "not", "run"], utterance.tokens)
+        self.assertEqual([], agent_utterance.tokens)
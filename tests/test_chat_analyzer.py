@@ -36,13 +36,13 @@ class TestChatAnalyzers(unittest.TestCase):
 
         analyzer.analyze(utterance)
 
-        self.assertEqual(2, len(utterance.triples))
+        # Both analyzers extract the same triple, which is merged only once
+        self.assertEqual(1, len(utterance.triples))
         triple = utterance.triples[0]
         self.assertEqual(UtteranceType.STATEMENT, triple['utterance_type'])
         self.assertEqual("Piek", triple['subject']['label'])
         self.assertEqual("like", triple['predicate']['label'])
         self.assertEqual("pizza", triple['object']['label'])
-        self.assertEqual(utterance.triples[0], utterance.triples[1])
 
 
 if __name__ == '__main__':
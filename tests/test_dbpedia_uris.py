@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from cltl.triple_extraction.utils import helper_functions
+from cltl.triple_extraction.utils.dbpedia_index import build_label_index
+
+LABELS = ['<http://dbpedia.org/resource/New_York_City> <http://www.w3.org/2000/01/rdf-schema#label> "New York"@en .',
+          '<http://dbpedia.org/resource/New_York_(state)> <http://www.w3.org/2000/01/rdf-schema#label> "New York"@en .',
+          '<http://dbpedia.org/resource/Amsterdam> <http://www.w3.org/2000/01/rdf-schema#label> "Amsterdam"@en .']
+
+
+class TestDBpediaUris(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        dump = os.path.join(self.directory.name, "labels.ttl")
+        with open(dump, 'w', encoding='utf-8') as dump_file:
+            dump_file.write("\n".join(LABELS) + "\n")
+        self.index = os.path.join(self.directory.name, "labels.idx")
+        build_label_index(dump, self.index)
+
+    def tearDown(self) -> None:
+        helper_functions.configure_uris()
+        self.directory.cleanup()
+
+    def test_multiword_element(self):
+        helper_functions.configure_uris(index_path=self.index)
+
+        # As passed by get_triple_element_type
+        element = "new york".replace(" ", "-")
+        self.assertEqual(["http://dbpedia.org/resource/New_York_(state)", "http://dbpedia.org/resource/New_York_City"],
+                         helper_functions.get_uris(element.strip()))
+        self.assertEqual(["http://dbpedia.org/resource/Amsterdam"], helper_functions.get_uris("Amsterdam"))
+        self.assertEqual([], helper_functions.get_uris("new-amsterdam"))
+
+    def test_offline_by_default(self):
+        helper_functions.configure_uris()
+
+        self.assertEqual([], helper_functions.get_uris("new-york"))
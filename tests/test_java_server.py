@@ -0,0 +1,34 @@
+import sys
+import time
+import unittest
+
+from cltl.triple_extraction.nlp.java_server import JavaSocketServer
+
+# Accepts connections on the port passed with -port but never responds
+UNRESPONSIVE_SERVER = """
+import socket, sys, time
+server = socket.socket()
+server.bind(('localhost', int(sys.argv[sys.argv.index('-port') + 1])))
+server.listen()
+connections = []
+while True:
+    connections.append(server.accept()[0])
+"""
+
+
+class TestJavaSocketServer(unittest.TestCase):
+    def setUp(self):
+        self.server = JavaSocketServer([sys.executable, '-c', UNRESPONSIVE_SERVER], startup_timeout=10,
+                                       request_timeout=0.5)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_request_timeout(self):
+        self.assertTrue(self.server.wait_ready(10))
+
+        start = time.time()
+        with self.assertRaises(TimeoutError):
+            self.server._request_batch(["hello world", "again"])
+
+        self.assertLess(time.time() - start, 5)
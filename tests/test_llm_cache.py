@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cltl.triple_extraction.llm.cache import ResponseCache, SQLiteBackend, MemoryBackend
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_POST(self):
+        StubLLMHandler.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(0.2)
+
+        response = json.dumps({"triples": [{"subject": "I", "predicate": "like", "object": body["content"]}]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(response.encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestResponseCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('localhost', 0), StubLLMHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = "http://localhost:%s" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubLLMHandler.requests = 0
+
+    def generate(self, content):
+        request = urllib.request.Request(self.url, json.dumps({"content": content}).encode('utf-8'))
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.read().decode('utf-8')
+
+    def test_key(self):
+        key = ResponseCache.key(model="qwen2.5", temperature=0.1, messages=[{"role": "user", "content": "hi"}])
+
+        self.assertEqual(key, ResponseCache.key(messages=[{"role": "user", "content": "hi"}],
+                                                temperature=0.1, model="qwen2.5"))
+        self.assertNotEqual(key, ResponseCache.key(model="qwen2.5", temperature=0.2,
+                                                   messages=[{"role": "user", "content": "hi"}]))
+
+    def test_coalesce_concurrent_requests(self):
+        cache = ResponseCache(MemoryBackend())
+        key = ResponseCache.key(content="cats")
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_call(key, lambda: self.generate("cats"))))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, StubLLMHandler.requests)
+        self.assertEqual(8, len(results))
+        self.assertEqual(1, len(set(results)))
+
+        cache.get_or_call(key, lambda: self.generate("cats"))
+        self.assertEqual(1, StubLLMHandler.requests)
+        self.assertEqual(1, cache.hits)
+
+    def test_rejected_responses_are_not_stored(self):
+        cache = ResponseCache(MemoryBackend())
+        key = ResponseCache.key(content="dogs")
+
+        cache.get_or_call(key, lambda: self.generate("dogs"), accept=lambda response: False)
+        cache.get_or_call(key, lambda: self.generate("dogs"), accept=lambda response: False)
+
+        self.assertEqual(2, StubLLMHandler.requests)
+
+    def test_lru_eviction(self):
+        backend = MemoryBackend(maxsize=2)
+        for key in ["a", "b", "a", "c"]:
+            backend.put(key, key)
+
+        self.assertEqual(2, len(backend))
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual("a", backend.get("a"))
+
+    def test_sqlite_backend_persists(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "responses.db")
+            key = ResponseCache.key(content="birds")
+
+            cache = ResponseCache(SQLiteBackend(path))
+            response = cache.get_or_call(key, lambda: self.generate("birds"))
+            cache.close()
+
+            cache = ResponseCache(SQLiteBackend(path))
+            self.assertEqual(response, cache.get_or_call(key, lambda: self.generate("birds")))
+            cache.close()
+
+        self.assertEqual(1, StubLLMHandler.requests)
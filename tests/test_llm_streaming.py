@@ -0,0 +1,46 @@
+import json
+import unittest
+
+from cltl.triple_extraction.llm.streaming import TripleStreamParser, parse_triples
+
+TRIPLES = [{"subject": "I", "predicate": "love", "object": "cats", "perspective": {"polarity": 1}},
+           {"subject": "you", "predicate": "like", "object": "dogs {and} \"birds\""}]
+
+
+class TestTripleStreamParser(unittest.TestCase):
+    def test_emit_triples_when_closed(self):
+        response = json.dumps({"triples": TRIPLES})
+        second_start = response.index('{"subject": "you"')
+
+        parser = TripleStreamParser()
+        emitted = []
+        for pos in range(len(response)):
+            emitted.append(parser.feed(response[pos]))
+        emitted.append(parser.close())
+
+        emitted_at = [pos for pos, triples in enumerate(emitted) if triples]
+        self.assertEqual(2, len(emitted_at))
+        self.assertLess(emitted_at[0], second_start)
+        self.assertEqual(TRIPLES, [triple for triples in emitted for triple in triples])
+
+    def test_ignore_other_arrays(self):
+        response = json.dumps({"dialogue": [{"subject": "x"}], "triples": TRIPLES[:1]})
+
+        self.assertEqual(TRIPLES[:1], parse_triples(response))
+
+    def test_repair_truncated_response(self):
+        response = json.dumps({"triples": TRIPLES})
+
+        self.assertEqual(TRIPLES, parse_triples(response[:-2]))
+        self.assertEqual(TRIPLES, parse_triples(response[:response.rindex('}]')]))
+        self.assertEqual(TRIPLES[:1] + [{"subject": "you", "predicate": "like"}],
+                         parse_triples(response[:response.index("dogs") + 4]))
+        self.assertEqual(TRIPLES[:1] + [{"subject": "you", "predicate": "like"}],
+                         parse_triples(response[:response.index("birds") + 5]))
+        self.assertEqual(TRIPLES[:1] + [{"subject": "you", "predicate": "like"}],
+                         parse_triples(response[:response.rindex('"object"') + 4]))
+
+    def test_invalid_response(self):
+        self.assertEqual([], parse_triples("Sorry, I can't help with that."))
+        self.assertEqual([], parse_triples('{"triples": "none"}'))
+        self.assertEqual([], parse_triples('{"triples": [{"subject": "I'))
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from cltl.triple_extraction.conversational_triples.pos_cache import PhraseCache
+
+
+class TestPhraseCache(unittest.TestCase):
+    def test_lookup_normalizes_phrase(self):
+        cache = PhraseCache()
+        cache.put('en_core_web_sm', 'tags', 'do like', ['AUX', 'VERB'])
+
+        self.assertEqual(('AUX', 'VERB'), cache.get('en_core_web_sm', 'tags', ' do  like '))
+        self.assertIsNone(cache.get('nl_core_news_sm', 'tags', 'do like'))
+        self.assertIsNone(cache.get('en_core_web_sm', 'tokens', 'do like'))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertAlmostEqual(1 / 3, cache.hit_rate)
+
+    def test_evicts_least_recently_used(self):
+        cache = PhraseCache(maxsize=2)
+        cache.put('en', 'tags', 'like', ['VERB'])
+        cache.put('en', 'tags', 'is from', ['AUX', 'ADP'])
+        cache.get('en', 'tags', 'like')
+        cache.put('en', 'tags', 'love', ['VERB'])
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(('VERB',), cache.get('en', 'tags', 'like'))
+        self.assertIsNone(cache.get('en', 'tags', 'is from'))
+
+    def test_warm_start_file(self):
+        cache = PhraseCache()
+        cache.put('en', 'tokens', 'is from', ['is', 'from'])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "phrases.json")
+            cache.save(path)
+
+            warm_cache = PhraseCache()
+            warm_cache.load(path)
+
+        self.assertEqual(('is', 'from'), warm_cache.get('en', 'tokens', 'is from'))
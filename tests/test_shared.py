@@ -0,0 +1,40 @@
+import threading
+import unittest
+
+from cltl.triple_extraction.nlp.shared import SharedInstance
+
+
+class Resource:
+    created = 0
+
+    def __init__(self):
+        Resource.created += 1
+
+
+class First:
+    RESOURCE = SharedInstance(Resource)
+
+
+class Second:
+    RESOURCE = SharedInstance(Resource)
+
+
+class TestSharedInstance(unittest.TestCase):
+    def test_created_once_on_first_access(self):
+        self.assertEqual(0, Resource.created)
+
+        threads = [threading.Thread(target=lambda: First.RESOURCE) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, Resource.created)
+        self.assertIs(First.RESOURCE, Second().RESOURCE)
+
+    def test_instance_override(self):
+        first = First()
+        first.RESOURCE = "own"
+
+        self.assertEqual("own", first.RESOURCE)
+        self.assertIsInstance(First().RESOURCE, Resource)
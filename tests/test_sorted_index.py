@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from cltl.triple_extraction.utils.dbpedia_index import parse_labels
+from cltl.triple_extraction.utils.sorted_index import SortedIndex, build_index
+
+
+class TestSortedIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "labels.idx")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_lookup(self):
+        items = [("Paris", "http://dbpedia.org/resource/Paris_(mythology)"),
+                 ("Paris", "http://dbpedia.org/resource/Paris"),
+                 ("Amsterdam", "http://dbpedia.org/resource/Amsterdam"),
+                 ("Zürich", "http://dbpedia.org/resource/Zürich"),
+                 ("Amsterdam", "http://dbpedia.org/resource/Amsterdam")]
+        self.assertEqual(3, build_index(self.path, items))
+
+        with SortedIndex(self.path) as index:
+            self.assertEqual(3, len(index))
+            self.assertEqual(["http://dbpedia.org/resource/Paris", "http://dbpedia.org/resource/Paris_(mythology)"],
+                             index.get("Paris"))
+            self.assertEqual(["http://dbpedia.org/resource/Amsterdam"], index.get("Amsterdam"))
+            self.assertEqual(["http://dbpedia.org/resource/Zürich"], index.get("Zürich"))
+            self.assertEqual([], index.get("Pari"))
+            self.assertEqual([], index.get("paris"))
+            self.assertNotIn("Utrecht", index)
+
+    def test_empty_index(self):
+        build_index(self.path, [])
+
+        with SortedIndex(self.path) as index:
+            self.assertEqual(0, len(index))
+            self.assertEqual([], index.get("Paris"))
+
+    def test_parse_labels(self):
+        lines = ['<http://dbpedia.org/resource/Albert_Einstein> <http://www.w3.org/2000/01/rdf-schema#label> "Albert Einstein"@en .',
+                 '<http://dbpedia.org/resource/Albert_Einstein> <http://www.w3.org/2000/01/rdf-schema#label> "Albert Einstein"@de .',
+                 '<http://dbpedia.org/resource/Café> <http://www.w3.org/2000/01/rdf-schema#label> "Caf\\u00E9 \\"Noir\\""@en .',
+                 '# comment']
+
+        self.assertEqual([("Albert Einstein", "http://dbpedia.org/resource/Albert_Einstein"),
+                          ('Café "Noir"', "http://dbpedia.org/resource/Café")],
+                         list(parse_labels(lines)))
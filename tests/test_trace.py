@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+import unittest
+
+from cltl.commons.discrete import UtteranceType
+
+from cltl.triple_extraction.triple import Triple, TripleElement
+from cltl.triple_extraction.utils.trace import JsonLinesSink, configure_trace, trace, trace_enabled
+
+
+class TestTrace(unittest.TestCase):
+    def tearDown(self) -> None:
+        configure_trace(None)
+
+    def test_trace_without_sink(self):
+        configure_trace(None)
+
+        self.assertFalse(trace_enabled())
+        trace("triple", triple=object())
+
+    def test_json_lines_sink(self):
+        triple = Triple(subject=TripleElement("piek"), predicate=TripleElement("like"),
+                        object=TripleElement("pizza"), utterance_type=UtteranceType.STATEMENT)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "trace.jsonl")
+            sink = JsonLinesSink(path)
+            configure_trace(sink)
+            trace("triple", analyzer="Test", turn=1, triple=triple)
+            sink.close()
+
+            with open(path) as trace_file:
+                events = [json.loads(line) for line in trace_file]
+
+        self.assertEqual(1, len(events))
+        self.assertEqual("triple", events[0]["event"])
+        self.assertEqual("pizza", events[0]["triple"]["object"]["label"])
+        self.assertEqual("STATEMENT", events[0]["triple"]["utterance_type"])
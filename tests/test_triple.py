@@ -0,0 +1,60 @@
+import unittest
+
+from cltl.triple_extraction.triple import Triple, TripleElement, Perspective
+
+
+class TestTriple(unittest.TestCase):
+    def setUp(self) -> None:
+        self.triple = Triple(subject=TripleElement("piek", ["person"]),
+                             predicate=TripleElement("like"),
+                             object=TripleElement("pizza", ["food"]),
+                             perspective={"polarity": 1.0, "certainty": 0.5})
+
+    def test_mapping_access(self):
+        self.assertEqual("piek", self.triple["subject"]["label"])
+        self.assertEqual(["food"], self.triple["object"]["type"])
+        self.assertIsInstance(self.triple["perspective"], Perspective)
+        self.assertIn("polarity", self.triple["perspective"])
+        self.assertNotIn("sentiment", self.triple["perspective"])
+        self.assertNotIn("utterance_type", self.triple)
+
+        self.triple["subject"]["label"] = "lenka"
+        self.assertEqual("lenka", self.triple.subject.label)
+
+        with self.assertRaises(KeyError):
+            self.triple["unknown"]
+
+    def test_keep_unknown_keys(self):
+        value = {"subject": {"label": "piek", "type": ["person"], "confidence": 0.9},
+                 "predicate": {"label": "like", "type": []},
+                 "object": {"label": "pizza", "type": [], "uri": "http://example.org/pizza"},
+                 "perspective": {"polarity": 1.0, "intensity": 0.5},
+                 "source": "llm"}
+
+        triple = Triple.from_dict(value)
+
+        self.assertEqual(0.9, triple["subject"]["confidence"])
+        self.assertIn("intensity", triple["perspective"])
+        self.assertEqual("llm", triple["source"])
+        self.assertEqual(value, triple.to_dict())
+
+    def test_equality_and_hash(self):
+        other = Triple(subject=TripleElement("piek", ["person"]),
+                       predicate=TripleElement("like"),
+                       object=TripleElement("pizza", ["food"]),
+                       perspective=Perspective(polarity=1.0, certainty=0.5))
+
+        self.assertEqual(self.triple, other)
+        self.assertEqual(1, len({self.triple, other}))
+
+        other["perspective"]["polarity"] = -1.0
+        self.assertNotEqual(self.triple, other)
+
+    def test_to_dict_round_trip(self):
+        expected = {"subject": {"label": "piek", "type": ["person"]},
+                    "predicate": {"label": "like", "type": []},
+                    "object": {"label": "pizza", "type": ["food"]},
+                    "perspective": {"polarity": 1.0, "certainty": 0.5}}
+
+        self.assertEqual(expected, self.triple.to_dict())
+        self.assertEqual(self.triple, Triple.from_dict(self.triple.to_dict()))